@@ -0,0 +1,21 @@
+from pydantic import BaseModel, EmailStr
+
+# Data model for signup requests with user name, email, and password
+class SignupRequest(BaseModel):
+    name: str
+    email: EmailStr
+    password: str
+
+# Data model for login requests with user email and password
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+# Data model for login responses returned to the client after signup/login
+class LoginResponse(BaseModel):
+    user_id: str
+    email: EmailStr
+    name: str
+    role: str
+    organization_id: str
+    organization_name: str
@@ -3,46 +3,42 @@
 # Purpose: FastAPI routes for user signup, login, and authenticated user retrieval with debug logging
 # ---
 
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi import APIRouter, HTTPException
 from app.utils.hash import hash_password, verify_password
-from pydantic import BaseModel, EmailStr
 from app.db import db
+from .models import SignupRequest, LoginRequest, LoginResponse
+from functools import lru_cache
+import asyncio
 import logging
 
-# Configure structured logging
+# Module logger; handlers and level are configured once in app/main.py
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
-security = HTTPBasic()
-
-# Data model for signup requests with user name, email, and password
-class SignupRequest(BaseModel):
-    name: str
-    email: EmailStr
-    password: str
-
-# Data model for login requests with user email and password
-class LoginRequest(BaseModel):
-    email: EmailStr
-    password: str
-
-# Data model for login responses returned to the client after signup/login
-class LoginResponse(BaseModel):
-    user_id: str
-    email: EmailStr
-    name: str
-    role: str
-    organization_id: str
-    organization_name: str
 
 # ---
 # Utility function to extract the organization domain from an email address.
 # Used for auto-linking users to their organization based on email domain.
+# Memoized since the set of distinct domains is small and the function is pure.
 # ---
+@lru_cache(maxsize=4096)
 def extract_org_from_email(email: str) -> str:
-    return email.split("@")[-1].lower().strip()
+    return email.rpartition("@")[2].lower()
+
+# ---
+# Build the LoginResponse payload as a plain dict.
+# FastAPI validates it once against response_model, so constructing the
+# model here as well would validate the same data twice.
+# ---
+def build_login_response(user, org) -> dict:
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": user.role,
+        "organization_id": org.id,
+        "organization_name": org.name,
+    }
 
 # ---
 # Handle user signup with structured logging for debugging 502 issues.
@@ -50,37 +46,40 @@ def extract_org_from_email(email: str) -> str:
 @router.post("/signup", response_model=LoginResponse)
 async def signup(data: SignupRequest):
     try:
-        logger.info(f"[SIGNUP] Received signup request for {data.email}")
+        logger.info("[SIGNUP] Received signup request for %s", data.email)
         org_domain = extract_org_from_email(data.email)
-        org = await db.organization.find_unique(where={"domain": org_domain})
-        if not org:
-            logger.info(f"[SIGNUP] Organization '{org_domain}' not found. Creating new organization.")
-            org = await db.organization.create({"domain": org_domain, "name": org_domain})
+        # Hashing is deliberately CPU-heavy; run it off the event loop
+        hashed = await asyncio.to_thread(hash_password, data.password)
 
-        existing = await db.user.find_first(where={
-            "email": data.email,
-            "organizationId": org.id
-        })
-        if existing:
-            logger.warning(f"[SIGNUP] Email {data.email} already exists in organization {org_domain}")
-            raise HTTPException(status_code=400, detail="Email already exists in organization")
+        # Org upsert and user creation run in one transaction so a failed
+        # signup never leaves an orphaned organization behind.
+        async with db.tx() as tx:
+            org = await tx.organization.upsert(
+                where={"domain": org_domain},
+                data={
+                    "create": {"domain": org_domain, "name": org_domain},
+                    "update": {},
+                },
+            )
 
-        hashed = hash_password(data.password)
-        user = await db.user.create({
-            "email": data.email,
-            "hashedPassword": hashed,
-            "name": data.name,
-            "role": "ADMIN",
-            "organizationId": org.id,
-        })
-        logger.info(f"[SIGNUP] User {data.email} successfully created in organization {org_domain}")
+            # User.email is globally unique, so look it up on that key
+            existing = await tx.user.find_unique(where={"email": data.email})
+            if existing:
+                logger.warning("[SIGNUP] Email %s already exists in organization %s", data.email, org_domain)
+                raise HTTPException(status_code=400, detail="Email already exists in organization")
 
-        return LoginResponse(
-            user_id=user.id, email=user.email, name=user.name,
-            role=user.role, organization_id=org.id, organization_name=org.name
-        )
+            user = await tx.user.create({
+                "email": data.email,
+                "hashedPassword": hashed,
+                "name": data.name,
+                "role": "ADMIN",
+                "organizationId": org.id,
+            })
+        logger.info("[SIGNUP] User %s successfully created in organization %s", data.email, org_domain)
+
+        return build_login_response(user, org)
     except Exception as e:
-        logger.error(f"[SIGNUP][ERROR] {e}", exc_info=True)
+        logger.error("[SIGNUP][ERROR] %s", e, exc_info=True)
         raise
 
 # ---
@@ -89,26 +88,23 @@ async def signup(data: SignupRequest):
 @router.post("/login", response_model=LoginResponse)
 async def login(data: LoginRequest):
     try:
-        logger.info(f"[LOGIN] Received login request for {data.email}")
-        org_domain = data.email.split("@")[-1]
+        logger.info("[LOGIN] Received login request for %s", data.email)
+        org_domain = extract_org_from_email(data.email)
         org = await db.organization.find_unique(where={"domain": org_domain})
         if not org:
-            logger.warning(f"[LOGIN] Organization '{org_domain}' not found for {data.email}")
+            logger.warning("[LOGIN] Organization '%s' not found for %s", org_domain, data.email)
             raise HTTPException(status_code=404, detail="Organization not found")
 
-        user = await db.user.find_first(where={
-            "email": data.email,
-            "organizationId": org.id
-        })
-        if not user or not verify_password(data.password, user.hashedPassword):
-            logger.warning(f"[LOGIN] Invalid credentials for {data.email}")
+        user = await db.user.find_unique(where={"email": data.email})
+        if user and user.organizationId != org.id:
+            user = None
+        # Verify off the event loop so concurrent requests keep being served
+        if not user or not await asyncio.to_thread(verify_password, data.password, user.hashedPassword):
+            logger.warning("[LOGIN] Invalid credentials for %s", data.email)
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
-        logger.info(f"[LOGIN] User {data.email} successfully authenticated")
-        return LoginResponse(
-            user_id=user.id, email=user.email, name=user.name,
-            role=user.role, organization_id=org.id, organization_name=org.name
-        )
+        logger.info("[LOGIN] User %s successfully authenticated", data.email)
+        return build_login_response(user, org)
     except Exception as e:
-        logger.error(f"[LOGIN][ERROR] {e}", exc_info=True)
+        logger.error("[LOGIN][ERROR] %s", e, exc_info=True)
         raise
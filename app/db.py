@@ -3,7 +3,53 @@
 # Purpose: Initializes and exposes a Prisma client instance for database operations
 # ---
 
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from prisma import Prisma
+import asyncio
+import os
+
+# ---
+# Connection pool settings appended to DATABASE_URL for the Prisma query engine.
+# - DB_CONNECTION_LIMIT: max open connections held by the engine pool
+# - DB_POOL_TIMEOUT: seconds a query waits for a free connection before failing
+# - DB_STATEMENT_CACHE_SIZE: prepared statements cached per connection so the
+#   fixed set of auth/incident queries skip parse+plan on repeat calls
+# - DB_PGBOUNCER: set to "true" when DATABASE_URL points at PgBouncer
+#   (transaction pooling mode), which disables server-side prepared statements
+# ---
+DB_CONNECTION_LIMIT = os.environ.get("DB_CONNECTION_LIMIT", "20")
+DB_POOL_TIMEOUT = os.environ.get("DB_POOL_TIMEOUT", "30")
+DB_STATEMENT_CACHE_SIZE = os.environ.get("DB_STATEMENT_CACHE_SIZE", "100")
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").strip().lower() == "true"
+
+# Number of pool connections opened eagerly at startup (0 disables warm-up)
+DB_POOL_WARM = int(os.environ.get("DB_POOL_WARM", "5"))
+
+# ---
+# Merge pool parameters into the datasource URL.
+# Values already present in DATABASE_URL take precedence so deployments
+# can still tune the pool directly in the connection string.
+# ---
+def build_datasource_url(url: str) -> str:
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    params.setdefault("connection_limit", DB_CONNECTION_LIMIT)
+    params.setdefault("pool_timeout", DB_POOL_TIMEOUT)
+    if DB_PGBOUNCER:
+        params.setdefault("pgbouncer", "true")
+    else:
+        params.setdefault("statement_cache_size", DB_STATEMENT_CACHE_SIZE)
+    return urlunsplit(parts._replace(query=urlencode(params)))
 
 # Initialize the Prisma client for database operations
-db = Prisma()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+db = Prisma(datasource={"url": build_datasource_url(DATABASE_URL)}) if DATABASE_URL else Prisma()
+
+# ---
+# Warm the engine connection pool by running concurrent trivial queries,
+# so the first real requests after startup don't pay connect/auth latency.
+# ---
+async def warm_pool(size: int = DB_POOL_WARM):
+    if size <= 0:
+        return
+    await asyncio.gather(*(db.execute_raw("SELECT 1") for _ in range(size)))
@@ -0,0 +1,49 @@
+# ---
+# File: app/health/middleware.py
+# Purpose: Pure ASGI fast path for liveness probes that bypasses the middleware stack and routing
+# ---
+
+# Path answered directly by the fast path (outside API_PREFIX, used by platform liveness probes)
+LIVENESS_PATH = b"/health"
+
+# ---
+# Precomputed ASGI response messages. The liveness payload never changes,
+# so nothing is serialized or allocated per probe.
+# ---
+LIVENESS_BODY = b'{"status":"ok"}'
+LIVENESS_START_MESSAGE = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(LIVENESS_BODY)).encode()),
+    ],
+}
+LIVENESS_BODY_MESSAGE = {"type": "http.response.body", "body": LIVENESS_BODY}
+LIVENESS_HEAD_BODY_MESSAGE = {"type": "http.response.body", "body": b""}
+
+
+class HealthFastPathMiddleware:
+    """
+    Liveness Probe Fast Path
+
+    Answers GET/HEAD requests for LIVENESS_PATH with a static {"status": "ok"}
+    before CORS, logging, exception handling or FastAPI routing run.
+    It only confirms the process is serving requests; dependency checks
+    remain on /api/v1/health for readiness.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["raw_path"] != LIVENESS_PATH
+            or scope["method"] not in ("GET", "HEAD")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await send(LIVENESS_START_MESSAGE)
+        await send(LIVENESS_HEAD_BODY_MESSAGE if scope["method"] == "HEAD" else LIVENESS_BODY_MESSAGE)
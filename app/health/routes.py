@@ -5,6 +5,7 @@
 
 from fastapi import APIRouter
 from redis import asyncio as aioredis
+import asyncio
 import os
 import time
 
@@ -13,8 +14,25 @@ from app.db import db
 # Track when the server started (for uptime calculation)
 START_TIME = time.time()
 
+# Upper bound for each dependency check so a hung dependency can't stall readiness probes
+HEALTH_CHECK_TIMEOUT_SECONDS = 2.0
+
 router = APIRouter(prefix="/health", tags=["Health"])
 
+# ---
+# Shared Redis client for health probes.
+# Reuses pooled connections so each probe is a single PING instead of a
+# full connect/auth/teardown cycle. Closed from the app shutdown handler.
+# ---
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+redis_client = aioredis.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    max_connections=10,
+    socket_keepalive=True,
+    health_check_interval=30,
+)
+
 
 async def check_database() -> dict:
     """
@@ -47,11 +65,8 @@ async def check_redis() -> dict:
     Returns status "ok" if PING returns True, "error" otherwise.
     """
     detail = {"status": "ok"}
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
     try:
-        client = aioredis.from_url(redis_url, decode_responses=True)
-        pong = await client.ping()
-        await client.close()
+        pong = await redis_client.ping()
         if pong is not True:
             detail["status"] = "error"
             detail["error"] = f"Unexpected PING response: {pong}"
@@ -61,6 +76,21 @@ async def check_redis() -> dict:
     return detail
 
 
+async def run_check(check) -> dict:
+    """
+    Bounded Health Check Runner
+
+    Runs a single dependency check with HEALTH_CHECK_TIMEOUT_SECONDS as an upper bound.
+    Timeouts and unexpected exceptions are reported as status "error".
+    """
+    try:
+        return await asyncio.wait_for(check(), timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"status": "error", "error": f"Timed out after {HEALTH_CHECK_TIMEOUT_SECONDS}s"}
+    except Exception as exc:
+        return {"status": "error", "error": str(exc)}
+
+
 @router.get("")
 async def health():
     """
@@ -79,8 +109,11 @@ async def health():
         - 200: Service is healthy (all checks passed)
         - 200: Service is degraded (some checks failed, but server is running)
     """
-    db_status = await check_database()
-    redis_status = await check_redis()
+    # Dependency checks are independent, so run them concurrently
+    db_status, redis_status = await asyncio.gather(
+        run_check(check_database),
+        run_check(check_redis),
+    )
 
     # Determine overall status
     overall = "ok"
@@ -140,7 +173,7 @@ async def keepalive_status():
     import app.main as main_module
     
     # Check if keep-alive is configured
-    keepalive_url = main_module.KEEPALIVE_URL
+    keepalive_url = main_module.CONFIG.keepalive_url
     
     if not keepalive_url:
         return {
@@ -162,8 +195,8 @@ async def keepalive_status():
     return {
         "enabled": True,
         "target_url": keepalive_url,
-        "interval_seconds": main_module.KEEPALIVE_INTERVAL_SECONDS,
-        "timeout_seconds": main_module.KEEPALIVE_TIMEOUT_SECONDS,
+        "interval_seconds": main_module.CONFIG.keepalive_interval,
+        "timeout_seconds": main_module.CONFIG.keepalive_timeout,
         "statistics": {
             "total_pings": total_pings,
             "successful_pings": total_pings,
@@ -3,8 +3,10 @@
 # Purpose: Handles automated incident creation, escalation, and resolution based on monitor status changes
 # ---
 
-from app.utils.redis_utils import publish_to_redis
+from app.utils.redis_utils import publish_nowait
 from datetime import datetime, timezone
+import asyncio
+import logging
 from app.monitors.failure_counter_manager import (
     increment_failure_counter,
     reset_failure_counter,
@@ -13,6 +15,8 @@ from app.monitors.failure_counter_manager import (
 from app.db import db as database
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 INCIDENT_THRESHOLDS = {
     "LOW": 3,
     "MEDIUM": 5,
@@ -21,6 +25,17 @@ INCIDENT_THRESHOLDS = {
 }
 SEVERITY_ORDER = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
 
+# Precomputed lookups: severity -> rank, and failure count -> severity to raise
+SEVERITY_RANK: dict[str, int] = {severity: rank for rank, severity in enumerate(SEVERITY_ORDER)}
+THRESHOLD_TO_SEVERITY: dict[int, str] = {threshold: severity for severity, threshold in INCIDENT_THRESHOLDS.items()}
+
+# Statuses that count towards the consecutive failure counter
+FAILURE_STATUSES = frozenset({"DOWN", "DEGRADED"})
+
+# Templates for auto-created incident title and description
+INCIDENT_TITLE_FMT = "%s %s"
+INCIDENT_DESCRIPTION_FMT = "Monitor %s is reporting status %s."
+
 # ---
 # Service class for incident management tied to monitor health.
 # Provides methods to handle monitor status changes,
@@ -34,23 +49,28 @@ class IncidentService:
     # If the monitor is UP, attempts to auto-resolve any existing open incident.
     # If the monitor is DOWN or DEGRADED, increments failure counters,
     # checks thresholds, and creates or escalates incidents as needed.
+    # Callers that already incremented the counter (record_failure) pass
+    # the resulting count as consecutive_failures to skip the extra round-trip.
     # ---
     @staticmethod
-    async def handle_monitor_status_change(monitor_id: str, status: str):
+    async def handle_monitor_status_change(
+        monitor_id: str,
+        status: str,
+        consecutive_failures: int | None = None,
+    ):
         if status == "UP":
             await IncidentService._resolve_incident_if_exists(monitor_id)
             return
 
         # Only handle incident creation/escalation for non-UP statuses
-        if status in ("DOWN", "DEGRADED"):
+        if status not in FAILURE_STATUSES:
+            return
+
+        if consecutive_failures is None:
             consecutive_failures = await increment_failure_counter(monitor_id)
-            severity_to_raise = next(
-                (severity for severity, threshold in INCIDENT_THRESHOLDS.items()
-                 if consecutive_failures == threshold),
-                None
-            )
-            if severity_to_raise:
-                await IncidentService._create_or_update_incident(monitor_id, status, severity_to_raise)
+        severity_to_raise = THRESHOLD_TO_SEVERITY.get(consecutive_failures)
+        if severity_to_raise:
+            await IncidentService._create_or_update_incident(monitor_id, status, severity_to_raise)
 
     # ---
     # Resolves an existing auto-created, open incident for a monitor if found.
@@ -68,30 +88,34 @@ class IncidentService:
             }
         )
         if incident:
+            resolved_at = datetime.now(timezone.utc)
+            resolved_at_iso = resolved_at.isoformat()
             resolved_incident = await database.incident.update(
                 where={"id": incident.id},
                 data={
                     "status": "RESOLVED",
-                    "resolvedAt": datetime.now(timezone.utc),
+                    "resolvedAt": resolved_at,
                 }
             )
-            print(
-                f"\n✅ [INCIDENT AUTO-RESOLVE] 🚀 Incident {resolved_incident.id} for monitor {monitor_id} auto-resolved at {resolved_incident.resolvedAt.isoformat()}.\n",
-                flush=True
+            logger.info(
+                "[INCIDENT AUTO-RESOLVE] Incident %s for monitor %s auto-resolved at %s",
+                resolved_incident.id,
+                monitor_id,
+                resolved_at_iso,
             )
-            await publish_to_redis("incident_updates_channel", {
+            publish_nowait("incident_updates_channel", {
                 "organization_id": resolved_incident.organizationId,
                 "type": "incident_resolved",
                 "payload": {
                     "id": resolved_incident.id,
                     "status": "RESOLVED",
-                    "resolvedAt": resolved_incident.resolvedAt.isoformat(),
+                    "resolvedAt": resolved_at_iso,
                     "monitorId": resolved_incident.monitorId,
                     "autoResolved": True,
                 }
             })
+            # reset_failure_counter also clears failed pings and the first-down timestamp
             await reset_failure_counter(monitor_id)
-            await clear_failed_pings(monitor_id)
 
     # ---
     # Creates a new incident or escalates an existing one for a monitor.
@@ -102,39 +126,46 @@ class IncidentService:
     # ---
     @staticmethod
     async def _create_or_update_incident(monitor_id: str, status: str, severity: str):
-        monitor = await database.monitor.find_unique(
-            where={"id": monitor_id},
-            include={"service": {"include": {"organization": True}}},
+        # Monitor and open-incident lookups are independent, so run them concurrently
+        monitor, existing_incident = await asyncio.gather(
+            database.monitor.find_unique(
+                where={"id": monitor_id},
+                include={"service": True},
+            ),
+            database.incident.find_first(
+                where={
+                    "monitorId": monitor_id,
+                    "status": "OPEN",
+                    "autoCreated": True,
+                }
+            ),
         )
 
         if not monitor:
-            print(f"[INCIDENT] Monitor {monitor_id} not found.")
+            logger.warning("[INCIDENT] Monitor %s not found.", monitor_id)
             return
 
         service = getattr(monitor, 'service', None)
-        org_id = getattr(service, 'organizationId', None) if service else None
+        org_id = getattr(monitor, 'organizationId', None)
         service_id = getattr(monitor, 'serviceId', None)
         monitor_name = getattr(monitor, 'name', None)
 
         if not service or not org_id or not monitor_name:
-            print(f"[INCIDENT][ERROR] Service, org, or monitor name missing for monitor {monitor_id}. Monitor: {monitor}, Service: {service}")
+            logger.error(
+                "[INCIDENT][ERROR] Service, org, or monitor name missing for monitor %s. Monitor: %s, Service: %s",
+                monitor_id,
+                monitor,
+                service,
+            )
             return
 
-        existing_incident = await database.incident.find_first(
-            where={
-                "monitorId": monitor_id,
-                "status": "OPEN",
-                "autoCreated": True,
-            }
-        )
-
         if existing_incident:
-            current_idx = SEVERITY_ORDER.index(existing_incident.severity)
-            new_idx = SEVERITY_ORDER.index(severity)
+            current_idx = SEVERITY_RANK[existing_incident.severity]
+            new_idx = SEVERITY_RANK[severity]
             update_data = {}
             if new_idx > current_idx:
                 update_data["severity"] = severity
-                print(f"[INCIDENT] Escalated incident {existing_incident.id} to {severity}")
+                logger.info("[INCIDENT] Escalated incident %s to %s", existing_incident.id, severity)
             if update_data:
                 await database.incident.update(
                     where={"id": existing_incident.id},
@@ -142,8 +173,8 @@ class IncidentService:
                 )
         else:
             incident_payload = {
-                "title": f"{monitor.name} {status}",
-                "description": f"Monitor {monitor.name} is reporting status {status}.",
+                "title": INCIDENT_TITLE_FMT % (monitor_name, status),
+                "description": INCIDENT_DESCRIPTION_FMT % (monitor_name, status),
                 "severity": severity,
                 "status": "OPEN",
                 "autoCreated": True,
@@ -156,10 +187,10 @@ class IncidentService:
             try:
                 incident = await database.incident.create(data=incident_payload)
             except Exception as e:
-                print(f"[INCIDENT][ERROR] Failed to create incident: {e}")
+                logger.error("[INCIDENT][ERROR] Failed to create incident: %s", e)
                 return
 
-            await publish_to_redis("incident_updates_channel", {
+            publish_nowait("incident_updates_channel", {
                 "organization_id": org_id,
                 "type": "incident_created",
                 "payload": {
@@ -175,5 +206,5 @@ class IncidentService:
                     "organizationId": org_id,
                 }
             })
-            print(f"[INCIDENT] Created incident {incident.id} for monitor {monitor_id}")
+            logger.info("[INCIDENT] Created incident %s for monitor %s", incident.id, monitor_id)
             await clear_failed_pings(monitor_id)
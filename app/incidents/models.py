@@ -2,7 +2,7 @@
 
 from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from enum import Enum
 
 class IncidentStatus(str, Enum):
@@ -26,8 +26,7 @@ class IncidentUpdateRead(BaseModel):
     createdAt: datetime
     createdBy: Optional[str]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class IncidentCreate(BaseModel):
     organizationId: str
@@ -61,5 +60,4 @@ class IncidentRead(BaseModel):
     updates: List[IncidentUpdateRead] = []
     autoResolved: Optional[bool] = False
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -38,15 +38,23 @@ async def create_incident(payload: incident_schemas.IncidentCreate):
     return incident
 
 # ---
-# Get all incidents for a given organization.
-# Requires the organizationId as a query parameter.
+# Get incidents for a given organization, newest first.
+# Requires the organizationId as a query parameter and supports
+# page/limit pagination so large tenants are not loaded in one response.
 # Returns a list of incidents including their updates.
 # ---
 @router.get("/", response_model=List[incident_schemas.IncidentRead])
-async def get_incidents(organizationId: str = Query(...)):
+async def get_incidents(
+    organizationId: str = Query(...),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+):
     incidents = await prisma.incident.find_many(
         where={"organizationId": organizationId},
         include={"updates": True},
+        order={"createdAt": "desc"},
+        take=limit,
+        skip=(page - 1) * limit,
     )
     return incidents
 
@@ -6,13 +6,17 @@
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 import logging
+import logging.handlers
 import asyncio
+import queue
 import os
 import httpx
 
-from app.db import db
+from app.db import db, warm_pool
 
 # Import routers for API functionality
 from app.services.routes import router as services_router
@@ -22,13 +26,63 @@ from app.monitors.latest_results import router as monitor_latest_router
 from app.monitors import org_monitors
 from app.incidents import routes as incident_routes
 from app.websocket import monitor_updates, incidents_ws_router
-from app.websocket import redis_listener
-from app.health.routes import router as health_router
+from app.websocket import redis_listener, incident_redis_listener
+from app.health.routes import router as health_router, redis_client as health_redis_client
+from app.monitors.redis_client import REDIS as shared_redis_client
+from app.health.middleware import HealthFastPathMiddleware
+
+# ---
+# Application Configuration
+# ---
+# Every environment variable read by this module is parsed once at import
+# into a single frozen CONFIG object; the rest of the module (and the
+# keep-alive status endpoint) reads attributes off CONFIG instead of
+# re-querying os.environ.
+# ---
+@dataclass(frozen=True, slots=True)
+class Config:
+    log_level: str
+    keepalive_url: str
+    keepalive_interval: int
+    keepalive_timeout: int
+    cors_origins: frozenset[str]
+    cors_debug: bool
+    is_production: bool
+    port: int
+    workers: int
+
+
+CONFIG = Config(
+    log_level=os.environ.get("LOG_LEVEL", "INFO").strip().upper(),
+    keepalive_url=os.environ.get("KEEPALIVE_URL", "").strip(),
+    keepalive_interval=int(os.environ.get("KEEPALIVE_INTERVAL_SECONDS", "600")),
+    keepalive_timeout=int(os.environ.get("KEEPALIVE_TIMEOUT_SECONDS", "10")),
+    cors_origins=frozenset(
+        origin.strip()
+        for origin in os.environ.get("CORS_ALLOW_ORIGINS", "").split(",")
+        if origin.strip()
+    ),
+    cors_debug=os.environ.get("CORS_DEBUG", "false").strip().lower() == "true",
+    is_production=os.environ.get("ENV", "").strip().lower() == "production",
+    port=int(os.environ.get("PORT", "8000")),
+    workers=int(os.environ.get("WEB_CONCURRENCY", "1")),
+)
 
 # ---
 # Logging Configuration
 # ---
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL controls verbosity (e.g. WARNING in production, DEBUG for CORS tracing).
+# Records are handed to a QueueHandler and written to stderr by a QueueListener
+# thread, so log I/O never blocks the event loop.
+# ---
+
+_log_queue = queue.SimpleQueue()
+# Records are fully formatted by the QueueHandler (basicConfig's format),
+# so the listener's stream handler writes the message as-is.
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+
+logging.basicConfig(level=CONFIG.log_level, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 # ---
@@ -54,19 +108,26 @@ logger = logging.getLogger(__name__)
 #   - Non-blocking: failures don't affect app functionality
 #   - Graceful shutdown: stops cleanly when app shuts down
 #   - Detailed logging for monitoring and debugging
+#   - Settings are read from CONFIG (keepalive_url / keepalive_interval / keepalive_timeout)
 # ---
-KEEPALIVE_URL = os.environ.get("KEEPALIVE_URL", "").strip()
-KEEPALIVE_INTERVAL_SECONDS = int(os.environ.get("KEEPALIVE_INTERVAL_SECONDS", "600"))
-KEEPALIVE_TIMEOUT_SECONDS = int(os.environ.get("KEEPALIVE_TIMEOUT_SECONDS", "10"))
+
+# ---
+# Shared outbound HTTP client, created in the lifespan and closed on shutdown.
+# One connection pool (and TLS session cache) for all outbound requests.
+# ---
+HTTP_CLIENT: httpx.AsyncClient | None = None
 
 # Internal state management for keep-alive background task
-_keepalive_stop_event = asyncio.Event()
-_keepalive_task: asyncio.Task | None = None
 _keepalive_ping_count = 0
 _keepalive_failure_count = 0
 
 
-async def keepalive_loop(url: str, interval_seconds: int, timeout_seconds: int) -> None:
+async def keepalive_loop(
+    client: httpx.AsyncClient,
+    url: str,
+    interval_seconds: int,
+    timeout_seconds: int,
+) -> None:
     """
     Keep-Alive Background Task
     
@@ -74,16 +135,17 @@ async def keepalive_loop(url: str, interval_seconds: int, timeout_seconds: int)
     This task runs indefinitely until the application shuts down.
     
     Args:
+        client: Shared httpx.AsyncClient (connection pool reused across pings)
         url: Full HTTP/HTTPS URL to ping (typically the /api/v1/health endpoint)
         interval_seconds: Time to wait between ping attempts
         timeout_seconds: HTTP request timeout limit
         
     Implementation Notes:
-        - Uses httpx.AsyncClient for non-blocking HTTP requests
+        - Uses the app-wide httpx.AsyncClient so pings reuse pooled connections
         - Tracks success/failure statistics for monitoring
         - Logs every ping attempt with status code or error details
         - Resilient: continues running even if individual pings fail
-        - Respects shutdown signals via _keepalive_stop_event
+        - Stops when the task is cancelled by the lifespan shutdown
     """
     global _keepalive_ping_count, _keepalive_failure_count
     
@@ -94,12 +156,12 @@ async def keepalive_loop(url: str, interval_seconds: int, timeout_seconds: int)
         timeout_seconds,
     )
     
-    async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-        while not _keepalive_stop_event.is_set():
+    try:
+        while True:
             try:
-                response = await client.get(url)
+                response = await client.get(url, timeout=timeout_seconds)
                 _keepalive_ping_count += 1
-                
+            
                 # Log successful pings with status code
                 if response.status_code == 200:
                     logger.info(
@@ -115,7 +177,7 @@ async def keepalive_loop(url: str, interval_seconds: int, timeout_seconds: int)
                         response.status_code,
                         _keepalive_ping_count,
                     )
-                    
+                
             except Exception as exc:
                 # Network errors, timeouts, or other failures
                 _keepalive_failure_count += 1
@@ -126,183 +188,280 @@ async def keepalive_loop(url: str, interval_seconds: int, timeout_seconds: int)
                     _keepalive_ping_count + _keepalive_failure_count,
                 )
 
-            # Wait for the specified interval before next ping
-            # Uses wait_for with timeout to allow graceful shutdown
-            try:
-                await asyncio.wait_for(
-                    _keepalive_stop_event.wait(),
-                    timeout=interval_seconds
-                )
-                # If we reach here, stop event was set - exit loop
-                break
-            except asyncio.TimeoutError:
-                # Normal path: timeout expired, time for next ping
-                continue
-    
-    logger.info(
-        "[KEEPALIVE] Service stopped | Total pings: %d | Failures: %d",
-        _keepalive_ping_count,
-        _keepalive_failure_count,
-    )
+            # Sleep until the next ping; shutdown cancels the task mid-sleep
+            await asyncio.sleep(interval_seconds)
+    finally:
+        logger.info(
+            "[KEEPALIVE] Service stopped | Total pings: %d | Failures: %d",
+            _keepalive_ping_count,
+            _keepalive_failure_count,
+        )
 
 # ---
-# Initialize FastAPI app instance
+# Background task supervisor
+# Keeps a long-running coroutine alive: if it raises (or returns, e.g. the
+# Redis listener after losing its connection) it is logged and relaunched
+# after a short backoff. Cancellation propagates so shutdown stays clean.
 # ---
-app = FastAPI()
-API_PREFIX = "/api/v1"
+SUPERVISOR_RESTART_DELAY_SECONDS = 1.0
 
-# ---
-# CORS Middleware for local and deployed frontend access
-# ---
-cors_env = os.environ.get("CORS_ALLOW_ORIGINS", "")
-allowed_origins = [origin.strip() for origin in cors_env.split(",") if origin.strip()]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+async def _supervise(name: str, coro_factory) -> None:
+    while True:
+        try:
+            await coro_factory()
+            logger.warning("[SUPERVISOR] %s exited, restarting", name)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("[SUPERVISOR] %s crashed, restarting", name)
+        await asyncio.sleep(SUPERVISOR_RESTART_DELAY_SECONDS)
 
 # ---
-# Middleware: Log all incoming HTTP requests for debugging
+# Application Lifespan
 # ---
-@app.middleware("http")
-async def log_cors(request: Request, call_next):
-    logger.info(f"[CORS] {request.method} {request.url}")
-    response = await call_next(request)
-    logger.info(f"[CORS] Response Access-Control-Allow-Origin: {response.headers.get('access-control-allow-origin')}")
-    return response
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application Lifespan Handler
 
-# ---
-# Application Lifecycle Events
-# ---
+    Initializes all critical services and background tasks when the server starts,
+    then gracefully stops them when the server is shutting down.
 
-@app.on_event("startup")
-async def startup():
-    """
-    Application Startup Handler
-    
-    Initializes all critical services and background tasks when the server starts.
-    Executed once during application bootstrap.
-    
     Startup Sequence:
-        1. Database connection establishment
-        2. Redis listener for real-time monitor updates (WebSocket broadcasting)
-        3. Keep-alive service (if configured) to prevent cold starts
-        
+        1. Database connection establishment and pool warm-up
+        2. Supervised Redis listeners for real-time monitor and incident updates
+           (WebSocket broadcasting, one subscription per process for each)
+        3. Shared outbound httpx.AsyncClient
+        4. Keep-alive service (if configured) to prevent cold starts
+
+    Shutdown Sequence:
+        1. Stop keep-alive service (if running)
+        2. Stop the Redis listeners (before the database disconnects)
+        3. Disconnect from database
+        4. Close the shared health-check and listener Redis clients
+        5. Close the shared outbound HTTP client
+
     Error Handling:
         - Database connection failures will crash the app (by design - can't run without DB)
         - Background tasks (Redis, keep-alive) run independently and won't block startup
+        - The Redis listeners are restarted by _supervise if they crash or exit
+        - Keep-alive task is cancelled directly (it is idle in asyncio.sleep between pings)
     """
-    global _keepalive_task
-    
+    global HTTP_CLIENT
+
     # Step 1: Database Connection
     logger.info("[STARTUP] Connecting to database...")
     await db.connect()
+    await warm_pool()
     logger.info("[STARTUP] ✓ Database connected successfully")
 
     # Step 2: Redis Listener for Real-Time Updates
-    logger.info("[STARTUP] Starting Redis listener for monitor updates...")
-    asyncio.create_task(redis_listener.redis_listener())
-    logger.info("[STARTUP] ✓ Redis listener task created")
+    logger.info("[STARTUP] Starting Redis listeners for monitor and incident updates...")
+    app.state.redis_listener_task = asyncio.create_task(
+        _supervise("redis_listener", redis_listener.redis_listener)
+    )
+    app.state.incident_listener_task = asyncio.create_task(
+        _supervise("incident_redis_listener", incident_redis_listener.incident_redis_listener)
+    )
+    logger.info("[STARTUP] ✓ Redis listener tasks created")
+
+    # Step 3: Shared outbound HTTP client
+    HTTP_CLIENT = httpx.AsyncClient(
+        timeout=CONFIG.keepalive_timeout,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    )
 
-    # Step 3: Keep-Alive Service (Conditional)
-    if KEEPALIVE_URL:
+    # Step 4: Keep-Alive Service (Conditional)
+    keepalive_task = None
+    if CONFIG.keepalive_url:
         logger.info("[STARTUP] Keep-alive is ENABLED")
-        _keepalive_task = asyncio.create_task(
+        keepalive_task = asyncio.create_task(
             keepalive_loop(
-                KEEPALIVE_URL,
-                KEEPALIVE_INTERVAL_SECONDS,
-                KEEPALIVE_TIMEOUT_SECONDS
+                HTTP_CLIENT,
+                CONFIG.keepalive_url,
+                CONFIG.keepalive_interval,
+                CONFIG.keepalive_timeout,
             )
         )
         logger.info("[STARTUP] ✓ Keep-alive task created")
     else:
         logger.info("[STARTUP] Keep-alive is DISABLED (KEEPALIVE_URL not set)")
-    
+
     logger.info("[STARTUP] All services initialized successfully")
 
-@app.on_event("shutdown")
-async def shutdown():
-    """
-    Application Shutdown Handler
-    
-    Gracefully stops all services and background tasks when the server is shutting down.
-    Ensures clean resource cleanup to prevent data corruption or connection leaks.
-    
-    Shutdown Sequence:
-        1. Stop keep-alive service (if running)
-        2. Disconnect from database
-        
-    Timeout Protection:
-        - Keep-alive task has 5-second grace period before forced cancellation
-        - Prevents hanging shutdowns while ensuring cleanup attempts complete
-    """
-    global _keepalive_task
-    
-    # Step 1: Graceful Keep-Alive Shutdown
-    if _keepalive_task:
-        logger.info("[SHUTDOWN] Stopping keep-alive service...")
-        _keepalive_stop_event.set()  # Signal task to stop
-        
-        try:
-            # Wait up to 5 seconds for graceful shutdown
-            await asyncio.wait_for(_keepalive_task, timeout=5)
-            logger.info("[SHUTDOWN] ✓ Keep-alive stopped gracefully")
-        except asyncio.TimeoutError:
-            # Force cancellation if graceful shutdown times out
-            logger.warning("[SHUTDOWN] Keep-alive timeout - forcing cancellation")
-            _keepalive_task.cancel()
+    try:
+        yield
+    finally:
+        # Step 1: Graceful Keep-Alive Shutdown
+        if keepalive_task:
+            logger.info("[SHUTDOWN] Stopping keep-alive service...")
+            keepalive_task.cancel()
             try:
-                await _keepalive_task
+                await keepalive_task
             except asyncio.CancelledError:
                 logger.info("[SHUTDOWN] ✓ Keep-alive cancelled")
-    
-    # Step 2: Database Disconnection
-    logger.info("[SHUTDOWN] Disconnecting database...")
-    await db.disconnect()
-    logger.info("[SHUTDOWN] ✓ Database disconnected")
-    
-    logger.info("[SHUTDOWN] All services stopped successfully")
+
+        # Step 2: Stop the Redis listeners
+        for task in (app.state.redis_listener_task, app.state.incident_listener_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        # Step 3: Database Disconnection
+        logger.info("[SHUTDOWN] Disconnecting database...")
+        await db.disconnect()
+        logger.info("[SHUTDOWN] ✓ Database disconnected")
+
+        # Step 4: Close the shared Redis clients (commands/publishes, health
+        # probes and the listeners)
+        await shared_redis_client.aclose()
+        await health_redis_client.aclose()
+        await redis_listener.pubsub_client.aclose()
+
+        # Step 5: Close shared outbound HTTP client
+        await HTTP_CLIENT.aclose()
+        HTTP_CLIENT = None
+
+        logger.info("[SHUTDOWN] All services stopped successfully")
+        _log_listener.stop()
+
+# ---
+# Initialize FastAPI app instance
+# All JSON responses are serialized with orjson by default.
+# Interactive docs and the OpenAPI schema are disabled when ENV=production.
+# ---
+docs_kwargs = {"docs_url": None, "redoc_url": None, "openapi_url": None} if CONFIG.is_production else {}
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse, **docs_kwargs)
+API_PREFIX = "/api/v1"
+
+# ---
+# CORS Middleware for local and deployed frontend access
+# Origins are parsed once into a frozenset; CORSMiddleware checks membership
+# with `origin in allow_origins`, so this makes the per-request check O(1).
+# Allow-methods/headers values are already pre-joined by Starlette at init.
+# ---
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CONFIG.cors_origins,
+    allow_credentials=False,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# ---
+# Middleware: Log all incoming HTTP requests for debugging
+# Implemented as pure ASGI middleware: it reads method/path straight from the
+# scope and inspects raw response headers, avoiding the extra task and
+# Request/Response allocations of @app.middleware("http") (BaseHTTPMiddleware).
+# Only registered when CORS_DEBUG=true, so production runs CORSMiddleware alone;
+# even then it only logs at DEBUG level, otherwise requests pass straight through.
+# ---
+class CORSLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not logger.isEnabledFor(logging.DEBUG):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                allow_origin = None
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"access-control-allow-origin":
+                        allow_origin = value.decode("latin-1")
+                        break
+                # Single log line per request: method, path and resulting ACAO header
+                logger.debug(
+                    "[CORS] %s %s | Access-Control-Allow-Origin: %s",
+                    scope["method"],
+                    scope["path"],
+                    allow_origin,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+if CONFIG.cors_debug:
+    app.add_middleware(CORSLogMiddleware)
+
+# ---
+# Middleware: Liveness probe fast path (registered last, so it runs first)
+# ---
+app.add_middleware(HealthFastPathMiddleware)
 
 # ---
 # Global exception handler for structured error logging
+# Logs only the exception type and message (no traceback formatting on the
+# request path) and returns a fixed body so internal details never reach clients.
 # ---
+INTERNAL_ERROR_CONTENT = {"detail": "internal server error"}
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"[UNHANDLED EXCEPTION] {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error(
+        "[UNHANDLED EXCEPTION] %s %s | %s: %s",
+        request.method,
+        request.url.path,
+        type(exc).__name__,
+        exc,
+    )
+    return ORJSONResponse(
         status_code=500,
-        content={"detail": str(exc)},
+        content=INTERNAL_ERROR_CONTENT,
     )
 
 # ---
 # Include all routers for API structure and real-time monitoring
 # ---
-app.include_router(services_router, prefix=API_PREFIX)
-app.include_router(auth_router, prefix=API_PREFIX)
-app.include_router(monitor_router, prefix=API_PREFIX)
-app.include_router(monitor_latest_router, prefix=API_PREFIX)
-app.include_router(org_monitors.router, prefix=API_PREFIX)
-app.include_router(monitor_updates.router, prefix=API_PREFIX)
-app.include_router(incident_routes.router, prefix=API_PREFIX)
-app.include_router(incidents_ws_router.router, prefix=API_PREFIX)
-app.include_router(health_router, prefix=API_PREFIX)
+API_ROUTERS = (
+    services_router,
+    auth_router,
+    monitor_router,
+    monitor_latest_router,
+    org_monitors.router,
+    monitor_updates.router,
+    incident_routes.router,
+    incidents_ws_router.router,
+    health_router,
+)
+
+for api_router in API_ROUTERS:
+    app.include_router(api_router, prefix=API_PREFIX)
 
 # ---
 # Entrypoint for local development with Uvicorn
+# Worker count comes from WEB_CONCURRENCY (default 1: one async worker
+# already serves requests concurrently). Every worker runs its own lifespan,
+# so each one holds a database pool (DB_CONNECTION_LIMIT connections),
+# keeps its own Redis pools and listener (needed: WebSocket clients are
+# per-process) and, if configured, its own keep-alive loop. Keep
+# WEB_CONCURRENCY * DB_CONNECTION_LIMIT below Postgres max_connections.
 # ---
 if __name__ == "__main__":
     import uvicorn
-    import os
 
-    port = int(os.environ.get("PORT", 8000))
-    logger.info(f"[RUN] Starting Uvicorn on 0.0.0.0:{port}")
+    logger.info(
+        "[RUN] Starting Uvicorn on 0.0.0.0:%d with %d worker(s)",
+        CONFIG.port,
+        CONFIG.workers,
+    )
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
-        port=port,
-        reload=False
+        port=CONFIG.port,
+        workers=CONFIG.workers,
+        reload=False,
+        loop="uvloop",
+        http="httptools",
+        # Protocol-level pings detect dead WebSocket clients
+        ws_ping_interval=20,
+        ws_ping_timeout=20,
+        # Request tracing is available via CORS_DEBUG=true + LOG_LEVEL=DEBUG
+        access_log=False,
     )
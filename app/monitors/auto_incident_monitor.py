@@ -2,58 +2,211 @@
 # File: app/monitors/auto_incident_monitor.py
 # Purpose: Background worker for polling monitors, publishing updates,
 # and auto-creating incidents based on monitor statuses.
-# Uses APScheduler for periodic monitor polling and Redis pubsub for dynamic monitor updates.
+# Uses APScheduler for periodic monitor polling (one job per interval bucket)
+# and Redis pubsub for dynamic monitor updates.
 # ---
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache, partial
 import asyncio
-import httpx
-import json
 import logging
+import logging.handlers
+import orjson
 import os
+import queue
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
+from prisma.errors import ForeignKeyViolationError
+from prisma.models import Monitor, Service
 from app.db import db as database
 from app.incidents.incident_services import IncidentService
 from app.utils.status_utils import determine_monitor_status
-from app.utils.redis_utils import publish_to_redis
-from app.monitors.failure_counter_manager import add_failed_ping, reset_failure_counter
+from app.utils.redis_utils import monitor_updates_channel, publish_nowait, publish_batcher, stop_publish_batcher
+from app.monitors.failure_counter_manager import record_failure, reset_failure_counter
+from app.monitors.http_client import HTTP_CLIENT
+from app.monitors.redis_client import REDIS
+from app.monitors.response_cache import (
+    queue_latest_results_invalidation,
+    queue_monitors_with_latest_invalidation,
+)
+
+# ---
+# Configure logging for the worker process and suppress noisy httpx logs in production.
+# LOG_LEVEL controls verbosity (per-ping lines are DEBUG). Records go through a
+# QueueHandler to a QueueListener thread so log writes never block the event loop.
+# ---
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
 
-# Configure logging to suppress noisy httpx logs in production
+logging.basicConfig(level=LOG_LEVEL, handlers=[logging.handlers.QueueHandler(_log_queue)])
 logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
 
 # Initialize the scheduler
 scheduler = AsyncIOScheduler()
 
 # ---
-# Helper: Safely creates a MonitoringResult with retry on FK constraint errors.
-# Skips insertion if the monitor does not exist.
+# In-process monitor registry.
+# Populated when monitors are scheduled and kept current by the
+# monitor_created/updated/deleted pubsub events, so pings don't need a DB
+# lookup to guard MonitoringResult inserts or to build the Redis payload.
+# Every code path that deletes monitors must publish "monitor_deleted" for
+# each of them after the delete (monitors/routes.py delete_monitor and the
+# cascading services/routes.py delete_service do). As a backstop, a monitor
+# is also evicted when an event finds it missing in the database or when its
+# results fail the MonitoringResult FK (flush_monitoring_results).
+# ---
+MONITOR_CACHE: dict[str, Monitor] = {}
+SERVICE_CACHE: dict[str, Service] = {}
+# Request headers per monitor id, parsed once when the monitor is cached
+HEADERS_CACHE: dict[str, dict[str, str]] = {}
+# Static part of each monitor's update payload (everything but latestResult)
+BASE_PAYLOAD_CACHE: dict[str, dict] = {}
+# Status of each monitor's previous ping, used to skip no-op UP -> UP incident checks
+LAST_STATUS: dict[str, str] = {}
+
+# ---
+# MonitoringResult write buffer.
+# Pings append rows here and result_flusher() inserts them with one
+# create_many every RESULT_FLUSH_INTERVAL_SECONDS instead of one INSERT per ping.
+# ---
+RESULT_FLUSH_INTERVAL_SECONDS = 0.5
+_RESULT_BUFFER: list[dict] = []
+
 # ---
-async def safe_create_monitoring_result(data, retries=3, delay=2):
+# Helper: Buffers a MonitoringResult for the next batch insert.
+# Skips the row if the monitor is no longer in the registry (deleted).
+# ---
+def safe_create_monitoring_result(data):
     monitor_id = data.get("monitorId")
 
-    if monitor_id:
-        monitor_exists = await database.monitor.find_unique(where={"id": monitor_id})
-        if not monitor_exists:
-            print(f"[DB] Skipping MonitoringResult insertion: Monitor {monitor_id} does not exist.")
-            return
+    if monitor_id and monitor_id not in MONITOR_CACHE:
+        logger.debug("[DB] Skipping MonitoringResult insertion: Monitor %s does not exist.", monitor_id)
+        return
+
+    _RESULT_BUFFER.append(data)
+
+# ---
+# Helper: Inserts all buffered MonitoringResults in one create_many.
+# There is no up-front existence query: a FK constraint error (a monitor
+# deleted since its ping) is handled here. The batch's monitor ids are then
+# checked against the database in one query; monitors that no longer exist
+# are evicted from the registry (covers a missed monitor_deleted event),
+# their rows dropped and the rest retried immediately. Only if every monitor
+# still exists does the retry back off.
+# ---
+async def flush_monitoring_results(retries=3, delay=2):
+    global _RESULT_BUFFER
+    if not _RESULT_BUFFER:
+        return
+    batch, _RESULT_BUFFER = _RESULT_BUFFER, []
 
     for attempt in range(retries):
         try:
-            await database.monitoringresult.create(data)
-            print(f"[DB] MonitoringResult created successfully for monitor {monitor_id}.")
+            await database.monitoringresult.create_many(data=batch, skip_duplicates=True)
+            logger.debug("[DB] %d MonitoringResults created successfully.", len(batch))
+            await invalidate_dashboard_caches(batch)
             return
-        except Exception as e:
-            if "ForeignKeyViolationError" in str(e):
-                print(f"[DB] FK violation on MonitoringResult for monitor {monitor_id}, retrying in {delay}s (Attempt {attempt + 1}/{retries})")
-                await asyncio.sleep(delay)
-                delay *= 2
+        except ForeignKeyViolationError:
+            existing_ids = await find_existing_monitor_ids({row["monitorId"] for row in batch})
+            if existing_ids is None:
+                remaining = batch
             else:
-                print(f"[DB] Unexpected error while creating MonitoringResult for monitor {monitor_id}: {e}")
-                raise
+                remaining = [row for row in batch if row["monitorId"] in existing_ids]
+            if not remaining:
+                return
+            if len(remaining) < len(batch):
+                # Rows for deleted monitors were the likely cause: retry the rest now
+                batch = remaining
+                continue
+            logger.warning(
+                "[DB] FK violation on MonitoringResult batch, retrying %d rows in %ss (Attempt %d/%d)",
+                len(batch),
+                delay,
+                attempt + 1,
+                retries,
+            )
+            await asyncio.sleep(delay)
+            delay *= 2
+        except Exception as e:
+            logger.error("[DB] Unexpected error while creating %d MonitoringResults: %s", len(batch), e)
+            return
+
+    logger.error("[DB] Failed to create %d MonitoringResults after %d attempts.", len(batch), retries)
+
+# ---
+# Returns which of monitor_ids still exist in the database, evicting the rest
+# from the registry. Returns None if the lookup itself fails.
+# ---
+async def find_existing_monitor_ids(monitor_ids: set[str]) -> set[str] | None:
+    try:
+        monitors = await database.monitor.find_many(where={"id": {"in": list(monitor_ids)}})
+    except Exception as e:
+        logger.warning("[DB] Failed to look up monitors for FK recovery: %s", e)
+        return None
+    existing_ids = {monitor.id for monitor in monitors}
+    for monitor_id in monitor_ids - existing_ids:
+        logger.warning("[DB] Monitor %s no longer exists, removing it from the registry", monitor_id)
+        evict_monitor(monitor_id)
+    return existing_ids
 
-    print(f"[DB] Failed to create MonitoringResult for monitor {monitor_id} after {retries} attempts.")
+# ---
+# Drops the cached dashboard payloads (latest results per org,
+# monitors-with-latest per service) that a flushed batch made stale,
+# one DEL per affected key in a single pipelined round-trip.
+# ---
+async def invalidate_dashboard_caches(batch: list[dict]):
+    service_ids = set()
+    organization_ids = set()
+    for row in batch:
+        monitor = MONITOR_CACHE.get(row["monitorId"])
+        if monitor:
+            service_ids.add(monitor.serviceId)
+            organization_ids.add(monitor.organizationId)
+    if not service_ids:
+        return
+    try:
+        async with REDIS.pipeline(transaction=False) as pipe:
+            for service_id in service_ids:
+                queue_monitors_with_latest_invalidation(pipe, service_id)
+            for organization_id in organization_ids:
+                queue_latest_results_invalidation(pipe, organization_id)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("[CACHE] Failed to invalidate dashboard caches: %s", e)
+
+# ---
+# Background task: flushes the MonitoringResult buffer on a short timer.
+# Flushes whatever is left once more when cancelled at shutdown.
+# ---
+async def result_flusher():
+    try:
+        while True:
+            await asyncio.sleep(RESULT_FLUSH_INTERVAL_SECONDS)
+            await flush_monitoring_results()
+    finally:
+        await flush_monitoring_results(retries=1)
+
+# ---
+# Ping concurrency limit.
+# Every ping holds an outbound HTTP connection and, while DOWN, Redis
+# connections for failure tracking, so concurrent pings are capped below the
+# shared Redis pool (app/monitors/redis_client.py) and the HTTP pool
+# (app/monitors/http_client.py). Pings past the limit wait their turn instead
+# of failing on an exhausted pool; their response time is measured only once
+# they start.
+# ---
+PING_CONCURRENCY = int(os.environ.get("PING_CONCURRENCY", "40"))
+_PING_SEMAPHORE = asyncio.Semaphore(PING_CONCURRENCY)
 
 # ---
 # Pings a given monitor URL, records the MonitoringResult,
@@ -61,97 +214,184 @@ async def safe_create_monitoring_result(data, retries=3, delay=2):
 # and publishes monitor updates to Redis for frontend updates.
 # ---
 async def ping_monitor(monitor):
+    async with _PING_SEMAPHORE:
+        await _ping_monitor(monitor)
+
+async def _ping_monitor(monitor):
     try:
-        # Prepare headers
-        headers = {}
-        if monitor.headers:
-            header_list = json.loads(monitor.headers) if isinstance(monitor.headers, str) else monitor.headers
-            headers = {header["key"]: header["value"] for header in header_list}
+        # Headers are pre-parsed when the monitor enters the registry
+        headers = HEADERS_CACHE.get(monitor.id)
+        if headers is None:
+            headers = parse_monitor_headers(monitor)
 
         timeout_seconds = monitor.timeout / 1000 if monitor.timeout else 5
 
-        async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-            start_time = datetime.now(timezone.utc)
-            response = await client.request(method=monitor.method, url=monitor.url, headers=headers)
-            end_time = datetime.now(timezone.utc)
-            response_time_ms = int((end_time - start_time).total_seconds() * 1000)
+        start_time = datetime.now(timezone.utc)
+        response = await HTTP_CLIENT.request(
+            method=monitor.method,
+            url=monitor.url,
+            headers=headers,
+            timeout=timeout_seconds,
+        )
+        end_time = datetime.now(timezone.utc)
+        response_time_ms = int((end_time - start_time).total_seconds() * 1000)
+
+        if response.is_error:
+            status = "DOWN"
+            error_message = f"HTTP error {response.status_code}"
+        else:
+            status = determine_monitor_status(
+                response.status_code,
+                response_time_ms,
+                monitor.degradedThreshold,
+            )
+            error_message = None
+
+        logger.debug(
+            "[PING] %s | %s | %s | %s | %dms | %s",
+            monitor.id,
+            monitor.name,
+            monitor.url,
+            status,
+            response_time_ms,
+            response.http_version,
+        )
 
-            if response.is_error:
-                status = "DOWN"
-                error_message = f"HTTP error {response.status_code}"
-            else:
-                status = determine_monitor_status(
-                    response.status_code,
-                    response_time_ms,
-                    monitor.degradedThreshold,
-                )
-                error_message = None
-
-            print(f"[PING] {monitor.id} | {monitor.name} | {monitor.url} | {status} | {response_time_ms}ms")
-
-            # Record MonitoringResult in DB
-            await safe_create_monitoring_result({
-                "monitorId": monitor.id,
-                "checkedAt": datetime.now(timezone.utc),
-                "status": status,
+        # Record MonitoringResult in DB
+        safe_create_monitoring_result({
+            "monitorId": monitor.id,
+            "checkedAt": end_time,
+            "status": status,
+            "responseTimeMs": response_time_ms,
+            "httpStatusCode": response.status_code,
+            "error": error_message,
+        })
+
+        # Handle failure tracking and incidents
+        failure_count = None
+        if status == "DOWN":
+            failure_count = await record_failure(monitor.id, {
+                "checkedAt": end_time,
                 "responseTimeMs": response_time_ms,
                 "httpStatusCode": response.status_code,
                 "error": error_message,
             })
 
-            # Handle failure tracking and incidents
-            if status == "DOWN":
-                await add_failed_ping(monitor.id, {
-                    "checkedAt": datetime.now(timezone.utc).isoformat(),
-                    "responseTimeMs": response_time_ms,
-                    "httpStatusCode": response.status_code,
-                    "error": error_message,
-                })
-
-            await IncidentService.handle_monitor_status_change(monitor.id, status)
+        # UP after UP has nothing to resolve; every failure still counts
+        if status != "UP" or LAST_STATUS.get(monitor.id) != "UP":
+            await IncidentService.handle_monitor_status_change(monitor.id, status, failure_count)
+        LAST_STATUS[monitor.id] = status
 
-            # Publish update to Redis
-            await publish_monitor_update(monitor.id, status, response_time_ms, response.status_code, error_message)
+        # Publish update to Redis
+        await publish_monitor_update(monitor.id, status, response_time_ms, response.status_code, error_message, end_time)
 
     except Exception as e:
-        print(f"[PING] {monitor.id} | {monitor.name} | {monitor.url} | DOWN | Exception: {e}")
+        now = datetime.now(timezone.utc)
+        error_message = str(e)
+        logger.info(
+            "[PING] %s | %s | %s | DOWN | Exception: %s",
+            monitor.id,
+            monitor.name,
+            monitor.url,
+            e,
+        )
 
         # Record failure MonitoringResult
-        await safe_create_monitoring_result({
+        safe_create_monitoring_result({
             "monitorId": monitor.id,
-            "checkedAt": datetime.now(timezone.utc),
+            "checkedAt": now,
             "status": "DOWN",
             "responseTimeMs": None,
             "httpStatusCode": None,
-            "error": str(e),
+            "error": error_message,
         })
 
         # Update failure counters and incidents
-        await add_failed_ping(monitor.id, {
-            "checkedAt": datetime.now(timezone.utc).isoformat(),
+        failure_count = await record_failure(monitor.id, {
+            "checkedAt": now,
             "responseTimeMs": None,
             "httpStatusCode": None,
-            "error": str(e),
+            "error": error_message,
         })
-        await IncidentService.handle_monitor_status_change(monitor.id, "DOWN")
+        await IncidentService.handle_monitor_status_change(monitor.id, "DOWN", failure_count)
+        LAST_STATUS[monitor.id] = "DOWN"
 
         # Publish update to Redis
-        await publish_monitor_update(monitor.id, "DOWN", None, None, str(e))
+        await publish_monitor_update(monitor.id, "DOWN", None, None, error_message, now)
 
 # ---
 # Publishes a monitor update to Redis with detailed payload for frontend updates.
+# Monitor and service fields come from the cached base payload; the message is
+# queued for the background publish_batcher instead of awaiting Redis here.
+# checked_at is the ping's timestamp, shared with the stored result
+# (orjson renders it as ISO-8601 when the message is published).
 # ---
-async def publish_monitor_update(monitor_id, status, response_time, status_code, error):
-    monitor = await database.monitor.find_unique(
-        where={"id": monitor_id},
-        include={"service": {"include": {"organization": True}}},
-    )
-    if not monitor:
+async def publish_monitor_update(monitor_id, status, response_time, status_code, error, checked_at):
+    base_payload = BASE_PAYLOAD_CACHE.get(monitor_id)
+    if base_payload is None:
         return
 
-    organization_id = monitor.service.organizationId if monitor.service else None
-
     payload = {
+        **base_payload,
+        "latestResult": {
+            "status": status,
+            "responseTimeMs": response_time,
+            "httpStatusCode": status_code,
+            "checkedAt": checked_at,
+            "error": error,
+        },
+    }
+
+    organization_id = MONITOR_CACHE[monitor_id].organizationId
+    publish_nowait(monitor_updates_channel(organization_id), {
+        "organization_id": organization_id,
+        "type": "monitor_update",
+        "payload": payload,
+    })
+
+# ---
+# Relations loaded with every monitor placed in the registry, both at startup
+# and on monitor_created/updated events, so cache entries are always complete.
+# ---
+MONITOR_CACHE_INCLUDE = {"service": True}
+
+# ---
+# Parses a raw JSON headers string into (key, value) pairs.
+# Memoized on the raw string, so identical header sets (and re-caching a
+# monitor whose headers didn't change) skip the JSON parse; being keyed on
+# content, entries never go stale and need no eviction on updates.
+# ---
+@lru_cache(maxsize=4096)
+def _parse_headers_json(raw: str) -> tuple[tuple[str, str], ...]:
+    return tuple((header["key"], header["value"]) for header in orjson.loads(raw))
+
+# ---
+# Builds the request headers dict from a monitor's stored [{key, value}] list.
+# ---
+def parse_monitor_headers(monitor: Monitor) -> dict[str, str]:
+    if not monitor.headers:
+        return {}
+    if isinstance(monitor.headers, str):
+        return dict(_parse_headers_json(monitor.headers))
+    return {header["key"]: header["value"] for header in monitor.headers}
+
+# ---
+# Adds or replaces a monitor (and its service) in the in-process registry,
+# parsing its headers once so pings don't redo it.
+# ---
+def cache_monitor(monitor: Monitor):
+    MONITOR_CACHE[monitor.id] = monitor
+    HEADERS_CACHE[monitor.id] = parse_monitor_headers(monitor)
+    if monitor.service:
+        SERVICE_CACHE[monitor.serviceId] = monitor.service
+    BASE_PAYLOAD_CACHE[monitor.id] = build_base_payload(monitor)
+
+# ---
+# Builds the monitor metadata sent with every monitor_update message.
+# ---
+def build_base_payload(monitor: Monitor) -> dict:
+    service = SERVICE_CACHE.get(monitor.serviceId)
+    return {
         "id": monitor.id,
         "name": monitor.name,
         "url": monitor.url,
@@ -163,86 +403,274 @@ async def publish_monitor_update(monitor_id, status, response_time, status_code,
         "degradedThreshold": monitor.degradedThreshold,
         "timeout": monitor.timeout,
         "serviceId": monitor.serviceId,
-        "serviceName": monitor.service.name if monitor.service else None,
-        "latestResult": {
-            "status": status,
-            "responseTimeMs": response_time,
-            "httpStatusCode": status_code,
-            "checkedAt": datetime.now(timezone.utc).isoformat(),
-            "error": error,
-        },
+        "serviceName": service.name if service else None,
     }
 
-    await publish_to_redis("monitor_updates_channel", {
-        "organization_id": organization_id,
-        "type": "monitor_update",
-        "payload": payload,
-    })
+# ---
+# Interval buckets: monitors grouped by check interval (seconds).
+# Each bucket has a single APScheduler job that starts a ping for each of its
+# monitors, so the scheduler wakes once per distinct interval rather than
+# once per monitor. Buckets are mutated in place as monitors change; the job
+# reads the bucket's current contents on every run.
+# ---
+MONITOR_BUCKETS: dict[int, dict[str, Monitor]] = {}
+
+def _bucket_job_id(interval: int) -> str:
+    return f"Interval-{interval}"
+
+# In-flight ping task per monitor id (pings started by ping_bucket)
+_PING_TASKS: dict[str, asyncio.Task] = {}
 
 # ---
-# Schedules periodic polling for all active monitors in the database on startup.
+# Starts a ping task for a monitor unless its previous ping is still
+# running (or queued), so a monitor is never pinged twice at once. Every
+# scheduled ping (interval buckets and the first ping after an event) goes
+# through here.
 # ---
-async def schedule_existing_monitors():
-    monitors = await database.monitor.find_many(where={"active": True})
-    for monitor in monitors:
+def start_ping(monitor: Monitor):
+    if monitor.id in _PING_TASKS:
+        logger.warning("[PING] %s | previous ping still running, skipping this run", monitor.id)
+        return
+    task = asyncio.create_task(ping_monitor(monitor))
+    _PING_TASKS[monitor.id] = task
+    task.add_done_callback(partial(_on_ping_done, monitor.id))
+
+# ---
+# Starts a ping task for every monitor in an interval bucket and returns
+# without waiting for them, so the job finishes at once and a slow monitor
+# (timeout > interval) can't make APScheduler skip the bucket's next tick.
+# ---
+async def ping_bucket(interval: int):
+    bucket = MONITOR_BUCKETS.get(interval)
+    if not bucket:
+        return
+    for monitor in list(bucket.values()):
+        start_ping(monitor)
+
+# ---
+# Job for the one-off first ping queued by monitor events (a coroutine, so
+# APScheduler runs it on the event loop rather than in a thread).
+# ---
+async def first_ping(monitor: Monitor):
+    start_ping(monitor)
+
+# ---
+# Done callback for ping tasks: clears the in-flight entry and logs any
+# error that escaped ping_monitor, which would otherwise be lost.
+# ---
+def _on_ping_done(monitor_id: str, task: asyncio.Task):
+    if _PING_TASKS.get(monitor_id) is task:
+        del _PING_TASKS[monitor_id]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("[PING] %s | ping failed: %r", monitor_id, task.exception())
+
+# ---
+# Adds a monitor to its interval bucket, creating the bucket's job if needed.
+# ---
+def add_to_bucket(monitor: Monitor):
+    bucket = MONITOR_BUCKETS.setdefault(monitor.interval, {})
+    bucket[monitor.id] = monitor
+    job_id = _bucket_job_id(monitor.interval)
+    if not scheduler.get_job(job_id):
         scheduler.add_job(
-            ping_monitor,
+            ping_bucket,
             trigger=IntervalTrigger(seconds=monitor.interval),
-            args=[monitor],
-            name=f"Monitor-{monitor.id}",
+            args=[monitor.interval],
+            id=job_id,
+            name=job_id,
             replace_existing=True,
         )
 
+# ---
+# Removes a monitor from its interval bucket, dropping the job once empty.
+# ---
+def remove_from_bucket(monitor: Monitor):
+    bucket = MONITOR_BUCKETS.get(monitor.interval)
+    if bucket is None:
+        return
+    bucket.pop(monitor.id, None)
+    if not bucket:
+        del MONITOR_BUCKETS[monitor.interval]
+        job_id = _bucket_job_id(monitor.interval)
+        if scheduler.get_job(job_id):
+            scheduler.remove_job(job_id)
+
+# ---
+# Schedules periodic polling for all active monitors in the database on startup.
+# Active monitors and their services are loaded in one query to seed the registry.
+# ---
+async def schedule_existing_monitors():
+    monitors = await database.monitor.find_many(
+        where={"active": True},
+        include=MONITOR_CACHE_INCLUDE,
+    )
+    for monitor in monitors:
+        cache_monitor(monitor)
+        add_to_bucket(monitor)
+
+# ---
+# Pubsub event handlers, keyed by channel.
+# created/updated (re)load the monitor into the registry and its interval
+# bucket, and queue a first ping 5s out so changes show up before the bucket's
+# next tick; updated also clears the failure state; deleted drops it from both.
+# service_updated refreshes a service's cached fields.
+# ---
+def _first_ping_job_id(monitor_id: str) -> str:
+    return f"Monitor-{monitor_id}"
+
+async def _schedule_monitor_from_event(monitor_id: str):
+    monitor = await database.monitor.find_unique(
+        where={"id": monitor_id},
+        include=MONITOR_CACHE_INCLUDE,
+    )
+    if not monitor:
+        # Deleted before the event was handled: drop anything still registered
+        evict_monitor(monitor_id)
+        return None
+    previous = MONITOR_CACHE.get(monitor_id)
+    if previous:
+        remove_from_bucket(previous)
+    cache_monitor(monitor)
+    add_to_bucket(monitor)
+    scheduler.add_job(
+        first_ping,
+        trigger=DateTrigger(run_date=datetime.now(timezone.utc) + timedelta(seconds=5)),
+        args=[monitor],
+        id=_first_ping_job_id(monitor.id),
+        name=_first_ping_job_id(monitor.id),
+        replace_existing=True,
+    )
+    return monitor
+
+async def _handle_monitor_created(monitor_id: str):
+    await _schedule_monitor_from_event(monitor_id)
+
+async def _handle_monitor_updated(monitor_id: str):
+    if await _schedule_monitor_from_event(monitor_id):
+        await reset_failure_counter(monitor_id)
+        LAST_STATUS.pop(monitor_id, None)
+
+async def _handle_monitor_deleted(monitor_id: str):
+    evict_monitor(monitor_id)
+
+# ---
+# Reloads a renamed/edited service and rebuilds the cached base payload of
+# each of its registered monitors, so later updates carry the new service name.
+# ---
+async def _handle_service_updated(service_id: str):
+    service = await database.service.find_unique(where={"id": service_id})
+    if not service:
+        return
+    SERVICE_CACHE[service_id] = service
+    for monitor in MONITOR_CACHE.values():
+        if monitor.serviceId == service_id:
+            BASE_PAYLOAD_CACHE[monitor.id] = build_base_payload(monitor)
+
+# ---
+# Removes a monitor from the registry, its interval bucket and the scheduler.
+# ---
+def evict_monitor(monitor_id: str):
+    previous = MONITOR_CACHE.pop(monitor_id, None)
+    HEADERS_CACHE.pop(monitor_id, None)
+    BASE_PAYLOAD_CACHE.pop(monitor_id, None)
+    LAST_STATUS.pop(monitor_id, None)
+    if previous:
+        remove_from_bucket(previous)
+    job_id = _first_ping_job_id(monitor_id)
+    if scheduler.get_job(job_id):
+        scheduler.remove_job(job_id)
+
+MONITOR_EVENT_HANDLERS = {
+    "monitor_created": _handle_monitor_created,
+    "monitor_updated": _handle_monitor_updated,
+    "monitor_deleted": _handle_monitor_deleted,
+    "service_updated": _handle_service_updated,
+}
+
+# References to in-flight handler tasks so they aren't garbage collected mid-run
+_event_tasks: set[asyncio.Task] = set()
+
+# ---
+# Per-monitor event serialization.
+# Events for different monitors run concurrently, but events for the same
+# monitor (or service, for service_updated) run one at a time in arrival order (asyncio.Lock wakes waiters
+# FIFO). Otherwise a monitor_deleted could finish while an earlier
+# created/updated handler is still awaiting find_unique, which would then
+# re-cache the deleted monitor. A lock is dropped once no event for its
+# monitor is pending.
+# ---
+_MONITOR_EVENT_LOCKS: dict[str, asyncio.Lock] = {}
+_MONITOR_EVENT_PENDING: dict[str, int] = {}
+
+async def _run_monitor_event(handler, monitor_id: str):
+    lock = _MONITOR_EVENT_LOCKS.setdefault(monitor_id, asyncio.Lock())
+    _MONITOR_EVENT_PENDING[monitor_id] = _MONITOR_EVENT_PENDING.get(monitor_id, 0) + 1
+    try:
+        async with lock:
+            await handler(monitor_id)
+    except Exception as e:
+        logger.error("[EVENT] %s failed for %s: %s", handler.__name__, monitor_id, e)
+    finally:
+        _MONITOR_EVENT_PENDING[monitor_id] -= 1
+        if not _MONITOR_EVENT_PENDING[monitor_id]:
+            del _MONITOR_EVENT_PENDING[monitor_id]
+            del _MONITOR_EVENT_LOCKS[monitor_id]
+
 # ---
 # Listens for Redis pubsub events to dynamically add, update, or remove monitors from the scheduler.
-# Uses `REDIS_URL` from environment for connection, defaulting to localhost for local development.
+# Subscribe acks are filtered by redis-py; each event is dispatched to its
+# handler as a separate task so a burst of events is processed concurrently
+# (serialized per monitor, see _run_monitor_event).
+# Subscribes through the shared monitor Redis client (app/monitors/redis_client.py).
 # ---
 async def listen_for_monitor_events():
-    from redis import asyncio as aioredis
+    pubsub = REDIS.pubsub()
+    await pubsub.subscribe(*MONITOR_EVENT_HANDLERS)
 
-    redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
-    redis_client = aioredis.from_url(redis_url, decode_responses=True)
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("monitor_created", "monitor_updated", "monitor_deleted")
-
-    async for message in pubsub.listen():
-        if message["type"] != "message":
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        if message is None:
             continue
 
-        event_type = message["channel"]
-        monitor_id = message["data"]
-
-        if event_type in ["monitor_created", "monitor_updated"]:
-            monitor = await database.monitor.find_unique(where={"id": monitor_id})
-            if monitor:
-                scheduler.add_job(
-                    ping_monitor,
-                    trigger=IntervalTrigger(seconds=monitor.interval),
-                    args=[monitor],
-                    name=f"Monitor-{monitor.id}",
-                    replace_existing=True,
-                    next_run_time=datetime.now(timezone.utc) + timedelta(seconds=5)
-                )
-                if event_type == "monitor_updated":
-                    await reset_failure_counter(monitor_id)
-
-        elif event_type == "monitor_deleted":
-            job_id = f"Monitor-{monitor_id}"
-            if scheduler.get_job(job_id):
-                scheduler.remove_job(job_id)
+        handler = MONITOR_EVENT_HANDLERS.get(message["channel"])
+        if handler:
+            task = asyncio.create_task(_run_monitor_event(handler, message["data"]))
+            _event_tasks.add(task)
+            task.add_done_callback(_event_tasks.discard)
 
 # ---
 # Entrypoint: Connects to the database, schedules monitors, starts the scheduler,
 # and begins listening for Redis pubsub monitor events.
+# The Redis publish batcher and MonitoringResult flusher run alongside; they
+# and the shared HTTP client are shut down when the worker exits (buffered
+# results get a final flush and queued updates are published first).
 # ---
 async def main():
     await database.connect()
-    await schedule_existing_monitors()
-    scheduler.start()
-    await listen_for_monitor_events()
+    publisher_task = asyncio.create_task(publish_batcher())
+    flusher_task = asyncio.create_task(result_flusher())
+    try:
+        await schedule_existing_monitors()
+        scheduler.start()
+        await listen_for_monitor_events()
+    finally:
+        for task in list(_PING_TASKS.values()):
+            task.cancel()
+        flusher_task.cancel()
+        await asyncio.gather(flusher_task, return_exceptions=True)
+        # Publish the updates still queued (after the final flush, whose
+        # cache invalidations also go to Redis) instead of discarding them
+        await stop_publish_batcher(publisher_task)
+        await HTTP_CLIENT.aclose()
 
 if __name__ == "__main__":
+    _log_listener.start()
     try:
-        asyncio.run(main())
+        # Same event loop as the API server (uvicorn --loop uvloop); every
+        # ping, Redis command and DB write in the worker is an await on it
+        run = uvloop.run if uvloop else asyncio.run
+        run(main())
     except KeyboardInterrupt:
-        print("[AUTO_MONITOR] Shutting down gracefully...")
+        logger.info("[AUTO_MONITOR] Shutting down gracefully...")
+    finally:
+        _log_listener.stop()
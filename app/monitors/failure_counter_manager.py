@@ -4,17 +4,13 @@
 # Used for incident detection, tracking consecutive failures, and clearing state upon resolution.
 # ---
 
-from redis import asyncio as aioredis
 from datetime import datetime, timezone
-import json
-import os
+import logging
+import orjson
 
-# ---
-# Initialize Redis client using REDIS_URL for Railway compatibility,
-# fallback to localhost for local development.
-# ---
-redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
-redis_client = aioredis.from_url(redis_url, decode_responses=True)
+from app.monitors.redis_client import REDIS as redis_client
+
+logger = logging.getLogger(__name__)
 
 # Key prefixes for Redis storage organization
 KEY_PREFIX = "monitor_failure_count:"
@@ -24,6 +20,46 @@ FIRST_DOWN_KEY_PREFIX = "monitor_first_down_timestamp:"
 # Threshold after which a monitor is considered critically down
 CRITICAL_THRESHOLD = 12
 
+# Failed ping records kept per monitor (older entries are trimmed)
+MAX_FAILED_PINGS = CRITICAL_THRESHOLD
+
+# ---
+# Server-side "increment unless critical" for the failure counter.
+# Runs atomically in one round-trip, so concurrent workers can't race between
+# reading the count and incrementing it.
+# KEYS[1] = failure count key, KEYS[2] = first down timestamp key
+# ARGV[1] = critical threshold, ARGV[2] = current UTC ISO timestamp
+# Returns {count, incremented}: incremented is 0 when already at the threshold.
+# ---
+INCREMENT_UNLESS_CRITICAL_LUA = """
+local c = tonumber(redis.call('GET', KEYS[1]) or '0')
+if c >= tonumber(ARGV[1]) then return {c, 0} end
+if c == 0 then redis.call('SET', KEYS[2], ARGV[2]) end
+return {redis.call('INCR', KEYS[1]), 1}
+"""
+INCREMENT_SCRIPT = redis_client.register_script(INCREMENT_UNLESS_CRITICAL_LUA)
+
+# ---
+# Run the increment script for a monitor, directly or queued on a pipeline.
+# ---
+def _increment_script_call(monitor_id: str, client=None):
+    return INCREMENT_SCRIPT(
+        keys=[f"{KEY_PREFIX}{monitor_id}", f"{FIRST_DOWN_KEY_PREFIX}{monitor_id}"],
+        args=[CRITICAL_THRESHOLD, datetime.now(timezone.utc).isoformat()],
+        client=client,
+    )
+
+# ---
+# Log the increment script's result and return the current count.
+# ---
+def _report_failure_count(monitor_id: str, result) -> int:
+    count, incremented = int(result[0]), int(result[1])
+    if not incremented:
+        logger.info("[DETECT] Monitor %s is already at CRITICAL. Not incrementing further until resolved.", monitor_id)
+        return count
+    logger.info("[DETECT] Monitor %s consecutive count: %d", monitor_id, count)
+    return count
+
 # ---
 # Increment the failure counter for a monitor in Redis.
 # Initializes first down timestamp if this is the first failure.
@@ -31,31 +67,41 @@ CRITICAL_THRESHOLD = 12
 # Returns the current failure count after increment.
 # ---
 async def increment_failure_counter(monitor_id: str):
-    key = f"{KEY_PREFIX}{monitor_id}"
-    count = await redis_client.get(key)
-    if count is None:
-        await set_first_down_timestamp(monitor_id)
-        count = 0
-    else:
-        count = int(count)
+    result = await _increment_script_call(monitor_id)
+    return _report_failure_count(monitor_id, result)
 
-    if count >= CRITICAL_THRESHOLD:
-        print(f"[DETECT] Monitor {monitor_id} is already at CRITICAL. Not incrementing further until resolved.")
-        return CRITICAL_THRESHOLD
+# ---
+# Record a failed ping: append its details (capped list) and run the
+# increment script in a single pipelined round-trip.
+# Returns the current failure count after increment.
+# ---
+async def record_failure(monitor_id: str, ping_data: dict) -> int:
+    async with redis_client.pipeline(transaction=False) as pipe:
+        queue_failed_ping(pipe, monitor_id, ping_data)
+        await _increment_script_call(monitor_id, client=pipe)
+        _, _, result = await pipe.execute()
+    return _report_failure_count(monitor_id, result)
 
-    new_count = await redis_client.incr(key)
-    print(f"[DETECT] Monitor {monitor_id} consecutive count: {new_count}")
-    return int(new_count)
+# ---
+# Queue deletion of all failure tracking keys for a monitor on a pipeline.
+# Lets callers batch the reset with other Redis commands in a single round-trip.
+# ---
+def queue_failure_state_reset(pipe, monitor_id: str):
+    pipe.delete(
+        f"{KEY_PREFIX}{monitor_id}",
+        f"{FAILED_PINGS_KEY_PREFIX}{monitor_id}",
+        f"{FIRST_DOWN_KEY_PREFIX}{monitor_id}",
+    )
 
 # ---
 # Reset the failure counter, failed pings, and first down timestamp
-# for a monitor upon resolution.
+# for a monitor upon resolution, in one pipelined round-trip.
 # ---
 async def reset_failure_counter(monitor_id: str):
-    await redis_client.delete(f"{KEY_PREFIX}{monitor_id}")
-    await clear_failed_pings(monitor_id)
-    await clear_first_down_timestamp(monitor_id)
-    print(f"[RESET] Failure counter and failed pings reset for {monitor_id}.")
+    async with redis_client.pipeline(transaction=False) as pipe:
+        queue_failure_state_reset(pipe, monitor_id)
+        await pipe.execute()
+    logger.info("[RESET] Failure counter and failed pings reset for %s.", monitor_id)
 
 # ---
 # Retrieve the current failure counter for a monitor.
@@ -87,18 +133,30 @@ async def clear_first_down_timestamp(monitor_id: str):
     await redis_client.delete(f"{FIRST_DOWN_KEY_PREFIX}{monitor_id}")
 
 # ---
-# Append a failed ping record for a monitor to its Redis list.
+# Queue appending a failed ping record on a pipeline, trimming the list to the
+# most recent MAX_FAILED_PINGS entries so long outages can't grow it unbounded.
+# ---
+def queue_failed_ping(pipe, monitor_id: str, ping_data: dict):
+    key = f"{FAILED_PINGS_KEY_PREFIX}{monitor_id}"
+    pipe.rpush(key, orjson.dumps(ping_data))
+    pipe.ltrim(key, -MAX_FAILED_PINGS, -1)
+
+# ---
+# Append a failed ping record for a monitor to its Redis list (capped).
 # Used to collect failure details for incident root cause analysis.
 # ---
 async def add_failed_ping(monitor_id: str, ping_data: dict):
-    await redis_client.rpush(f"{FAILED_PINGS_KEY_PREFIX}{monitor_id}", json.dumps(ping_data))
+    async with redis_client.pipeline(transaction=False) as pipe:
+        queue_failed_ping(pipe, monitor_id, ping_data)
+        await pipe.execute()
 
 # ---
-# Retrieve all failed pings for a monitor, parsed into dicts.
+# Retrieve the stored failed pings for a monitor (at most MAX_FAILED_PINGS,
+# oldest first), parsed into dicts.
 # ---
 async def get_failed_pings(monitor_id: str) -> list[dict]:
     data = await redis_client.lrange(f"{FAILED_PINGS_KEY_PREFIX}{monitor_id}", 0, -1)
-    return [json.loads(item) for item in data]
+    return [orjson.loads(item) for item in data]
 
 # ---
 # Clear all stored failed pings for a monitor after incident resolution.
@@ -0,0 +1,30 @@
+# ---
+# File: app/monitors/http_client.py
+# Purpose: Shared outbound HTTP client for the monitor worker.
+# One long-lived connection pool so repeated pings to the same hosts reuse
+# TCP/TLS connections (and multiplex over HTTP/2 where the target supports it)
+# instead of handshaking on every check.
+# ---
+
+import httpx
+
+# ---
+# Pool and protocol settings live on the transport (a custom transport
+# ignores the client-level http2/limits arguments).
+# retries=0: a failed connect is reported as-is rather than silently retried,
+# which would inflate the measured response time.
+# ---
+HTTP_TRANSPORT = httpx.AsyncHTTPTransport(
+    http2=True,
+    limits=httpx.Limits(
+        max_keepalive_connections=100,
+        max_connections=200,
+        keepalive_expiry=60.0,
+    ),
+    retries=0,
+)
+
+HTTP_CLIENT = httpx.AsyncClient(
+    transport=HTTP_TRANSPORT,
+    timeout=httpx.Timeout(5.0),
+)
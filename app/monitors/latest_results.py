@@ -5,9 +5,18 @@
 # ---
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from app.db import db
+from app.monitors.response_cache import (
+    LATEST_RESULTS_CACHE_TTL_SECONDS,
+    cache_body,
+    get_cached_body,
+    latest_results_key,
+)
 from typing import List, Optional
 from pydantic import BaseModel
+import orjson
+import os
 
 # ---
 # Initialize the router for monitor-related endpoints.
@@ -34,66 +43,150 @@ class MonitorLatestResultResponse(BaseModel):
     latestResult: Optional[dict]  # Contains latest MonitoringResult details if available
 
 # ---
-# GET endpoint to retrieve the latest monitoring results for each monitor
-# belonging to all services of the specified organization.
-# Orders services by creation date, retrieves each monitor's latest result,
-# and returns a flattened list of monitors with their latest statuses.
+# Single query returning every monitor of the organization's services joined
+# with its most recent MonitoringResult (LATERAL ... LIMIT 1), ordered like the
+# dashboard: services by creation date.
 # ---
-@router.get("/latest-results", response_model=List[MonitorLatestResultResponse])
-async def get_latest_monitor_results(organizationId: str = Query(...)):
-    try:
-        # Fetch all services under the organization with associated monitors
-        # and their latest monitoring result (most recent by checkedAt).
-        services = await db.service.find_many(
-            where={"organizationId": organizationId},
-            include={
-                "monitors": {
-                    "include": {
-                        "monitoringResults": {
-                            "orderBy": {"checkedAt": "desc"},
-                            "take": 1
-                        }
-                    }
-                }
-            },
-            order={"createdAt": "asc"}
+LATEST_RESULTS_SQL = """
+SELECT
+    m."id", m."name", m."url", m."method", m."interval", m."type", m."headers",
+    m."active", m."degradedThreshold", m."timeout", m."serviceId",
+    s."name" AS "serviceName",
+    mr."status", mr."responseTimeMs", mr."httpStatusCode", mr."checkedAt", mr."error"
+FROM "Service" s
+JOIN "Monitor" m ON m."serviceId" = s."id"
+LEFT JOIN LATERAL (
+    SELECT r."status", r."responseTimeMs", r."httpStatusCode", r."checkedAt", r."error"
+    FROM "MonitoringResult" r
+    WHERE r."monitorId" = m."id"
+    ORDER BY r."checkedAt" DESC
+    LIMIT 1
+) mr ON true
+WHERE s."organizationId" = $1
+ORDER BY s."createdAt" ASC
+"""
+
+# ---
+# LATEST_RESULTS_RAW_SQL=false switches to the Prisma-only query path
+# (for setups where raw SQL is not wanted). Both paths are a fixed number
+# of round-trips regardless of monitor count.
+# ---
+LATEST_RESULTS_RAW_SQL = os.environ.get("LATEST_RESULTS_RAW_SQL", "true").strip().lower() == "true"
+
+
+# ---
+# Raw SQL path: one round-trip. DateTime values come back as ISO-8601 strings.
+# ---
+async def fetch_latest_rows_raw(organization_id: str) -> list[dict]:
+    return await db.query_raw(LATEST_RESULTS_SQL, organization_id)
+
+# ---
+# Prisma path: services with monitors, a group_by for each monitor's newest
+# checkedAt, then one find_many for those results - three queries in total.
+# Produces the same row shape as the raw SQL path.
+# ---
+async def fetch_latest_rows_prisma(organization_id: str) -> list[dict]:
+    services = await db.service.find_many(
+        where={"organizationId": organization_id},
+        include={"monitors": True},
+        order={"createdAt": "asc"},
+    )
+    latest_per_monitor = await db.monitoringresult.group_by(
+        by=["monitorId"],
+        max={"checkedAt": True},
+        where={"monitor": {"is": {"organizationId": organization_id}}},
+    )
+
+    latest_by_monitor = {}
+    if latest_per_monitor:
+        latest_results = await db.monitoringresult.find_many(
+            where={
+                "OR": [
+                    {"monitorId": group["monitorId"], "checkedAt": group["_max"]["checkedAt"]}
+                    for group in latest_per_monitor
+                ]
+            }
         )
+        latest_by_monitor = {result.monitorId: result for result in latest_results}
 
-        results = []
+    rows = []
+    append = rows.append
+    for service in services:
+        service_name = service.name
+        for monitor in service.monitors or []:
+            latest = latest_by_monitor.get(monitor.id)
+            append({
+                "id": monitor.id,
+                "name": monitor.name,
+                "url": monitor.url,
+                "method": monitor.method,
+                "interval": monitor.interval,
+                "type": monitor.type,
+                "headers": monitor.headers,
+                "active": monitor.active,
+                "degradedThreshold": monitor.degradedThreshold,
+                "timeout": monitor.timeout,
+                "serviceId": monitor.serviceId,
+                "serviceName": service_name,
+                "status": latest.status if latest else None,
+                "responseTimeMs": latest.responseTimeMs if latest else None,
+                "httpStatusCode": latest.httpStatusCode if latest else None,
+                "checkedAt": latest.checkedAt.isoformat() if latest else None,
+                "error": latest.error if latest else None,
+            })
+    return rows
 
-        # Flatten monitors from services and attach their latest monitoring result
-        for service in services:
-            for monitor in service.monitors:
-                latest = (
-                    monitor.monitoringResults[0]
-                    if monitor.monitoringResults else None
-                )
-                results.append(
-                    MonitorLatestResultResponse(
-                        id=monitor.id,
-                        name=monitor.name,
-                        url=monitor.url,
-                        method=monitor.method,
-                        interval=monitor.interval,
-                        type=monitor.type,
-                        headers=monitor.headers,
-                        active=monitor.active,
-                        degradedThreshold=monitor.degradedThreshold,
-                        timeout=monitor.timeout,
-                        serviceId=monitor.serviceId,
-                        serviceName=service.name,
-                        latestResult={
-                            "status": latest.status if latest else None,
-                            "responseTimeMs": latest.responseTimeMs if latest else None,
-                            "httpStatusCode": latest.httpStatusCode if latest else None,
-                            "checkedAt": latest.checkedAt.isoformat() if latest else None,
-                            "error": latest.error if latest else None
-                        } if latest else None
-                    )
-                )
+# ---
+# GET endpoint to retrieve the latest monitoring results for each monitor
+# belonging to all services of the specified organization.
+# Fetches monitors and their latest result in one round-trip (or three on the
+# Prisma path) and returns a flattened list of monitors with their latest statuses.
+# Rows are already typed by the DB, so each row is mapped straight to the
+# MonitorLatestResultResponse shape as a plain dict and encoded once with
+# orjson; the model is declared under `responses` for the OpenAPI schema
+# only. The encoded body is cached briefly in Redis (app/monitors/response_cache.py)
+# and served as-is on hits.
+# ---
+@router.get("/latest-results", responses={200: {"model": List[MonitorLatestResultResponse]}})
+async def get_latest_monitor_results(organizationId: str = Query(...)):
+    cache_key = latest_results_key(organizationId)
+    cached = await get_cached_body(cache_key, LATEST_RESULTS_CACHE_TTL_SECONDS)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-        return results
+    try:
+        if LATEST_RESULTS_RAW_SQL:
+            rows = await fetch_latest_rows_raw(organizationId)
+        else:
+            rows = await fetch_latest_rows_prisma(organizationId)
 
+        body = orjson.dumps([
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "url": row["url"],
+                "method": row["method"],
+                "interval": row["interval"],
+                "type": row["type"],
+                "headers": row["headers"],
+                "active": row["active"],
+                "degradedThreshold": row["degradedThreshold"],
+                "timeout": row["timeout"],
+                "serviceId": row["serviceId"],
+                "serviceName": row["serviceName"],
+                "latestResult": {
+                    "status": row["status"],
+                    "responseTimeMs": row["responseTimeMs"],
+                    "httpStatusCode": row["httpStatusCode"],
+                    "checkedAt": row["checkedAt"],
+                    "error": row["error"],
+                } if row["checkedAt"] is not None else None,
+            }
+            for row in rows
+        ])
     except Exception as e:
         # Return 400 with error details on failure for clearer frontend debugging
         raise HTTPException(status_code=400, detail=str(e))
+
+    await cache_body(cache_key, body, LATEST_RESULTS_CACHE_TTL_SECONDS)
+    return Response(content=body, media_type="application/json")
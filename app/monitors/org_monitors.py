@@ -4,7 +4,8 @@
 # including their associated service names for frontend listing.
 # ---
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Query
+from fastapi.responses import ORJSONResponse
 from app.db import db
 from .models import MonitorWithServiceResponse
 from typing import List
@@ -18,8 +19,12 @@ router = APIRouter(prefix="/monitors", tags=["Monitors"])
 # GET endpoint to retrieve all monitors under a given organization,
 # flattening monitors from services and attaching the service name to each monitor.
 # Used for dashboards and admin pages to list and manage all monitors easily.
+# Rows come straight from typed DB records, so each one is mapped to a plain
+# dict in the MonitorWithServiceResponse shape and returned as an
+# ORJSONResponse; the model is declared under `responses` for the OpenAPI
+# schema only, so no per-row model is built or re-validated.
 # ---
-@router.get("", response_model=List[MonitorWithServiceResponse])
+@router.get("", responses={200: {"model": List[MonitorWithServiceResponse]}})
 async def get_all_monitors(organizationId: str = Query(...)):
     # Fetch all services for the organization with their associated monitors
     services = await db.service.find_many(
@@ -32,24 +37,23 @@ async def get_all_monitors(organizationId: str = Query(...)):
 
     # Flatten monitors with attached service name
     for svc in services:
+        service_name = svc.name
         for m in svc.monitors:
-            all_monitors.append(
-                MonitorWithServiceResponse(
-                    id=m.id,
-                    name=m.name,
-                    url=m.url,
-                    method=m.method,
-                    interval=m.interval,
-                    type=m.type,
-                    headers=m.headers,
-                    active=m.active,
-                    degradedThreshold=m.degradedThreshold,
-                    timeout=m.timeout,
-                    serviceId=m.serviceId,
-                    serviceName=svc.name,
-                    createdAt=m.createdAt.isoformat(),
-                    updatedAt=m.updatedAt.isoformat()
-                )
-            )
+            all_monitors.append({
+                "id": m.id,
+                "name": m.name,
+                "url": m.url,
+                "method": m.method,
+                "interval": m.interval,
+                "type": m.type,
+                "headers": m.headers,
+                "active": m.active,
+                "degradedThreshold": m.degradedThreshold,
+                "timeout": m.timeout,
+                "serviceId": m.serviceId,
+                "serviceName": service_name,
+                "createdAt": m.createdAt.isoformat(),
+                "updatedAt": m.updatedAt.isoformat(),
+            })
 
-    return all_monitors
+    return ORJSONResponse(content=all_monitors)
@@ -0,0 +1,33 @@
+# ---
+# File: app/monitors/redis_client.py
+# Purpose: Shared Redis client for commands and publishes (monitor and service
+# routes, response caches, failure counters, app/utils/redis_utils.py publishing
+# and the worker's monitor-event subscription), so a process holds one pool.
+# New Redis callers should import REDIS from here instead of creating a client.
+# The only separate pools are the WebSocket pub/sub listeners' (long-lived
+# subscribed connections) and the health probe's (so probes still answer when
+# this pool is saturated).
+# ---
+
+from redis import asyncio as aioredis
+import os
+
+# REDIS_URL for containers, REDIS_PUBLIC_URL or localhost for local development
+REDIS_URL = os.environ.get("REDIS_URL") or os.environ.get("REDIS_PUBLIC_URL") or "redis://localhost:6379"
+
+# ---
+# Blocking pool: when all connections are checked out, callers wait up to
+# REDIS_POOL_TIMEOUT_SECONDS for one to be released instead of failing at
+# once with "Too many connections" (e.g. many monitors going DOWN together).
+# ---
+REDIS_MAX_CONNECTIONS = 50
+REDIS_POOL_TIMEOUT_SECONDS = 10
+
+REDIS = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT_SECONDS,
+    )
+)
@@ -0,0 +1,64 @@
+# ---
+# File: app/monitors/response_cache.py
+# Purpose: Short-lived Redis cache for serialized dashboard responses
+# (org-wide latest results and per-service monitors-with-latest), plus the
+# key helpers used by the API and the worker to invalidate them.
+# ---
+
+from app.monitors.redis_client import REDIS as redis_client
+from typing import Optional
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# ---
+# TTLs in seconds; 0 disables the respective cache.
+# Entries are also dropped when the data behind them changes (monitor
+# create/delete, service delete, and each worker result flush), so the TTL
+# only bounds staleness if an invalidation is missed.
+# ---
+LATEST_RESULTS_CACHE_TTL_SECONDS = int(os.environ.get("LATEST_RESULTS_CACHE_TTL_SECONDS", "3"))
+MONITORS_WITH_LATEST_CACHE_TTL_SECONDS = int(os.environ.get("MONITORS_WITH_LATEST_CACHE_TTL_SECONDS", "10"))
+
+LATEST_RESULTS_CACHE_KEY_PREFIX = "latest_results:"
+MONITORS_WITH_LATEST_CACHE_KEY_PREFIX = "monitors_with_latest:"
+
+def latest_results_key(organization_id: str) -> str:
+    return f"{LATEST_RESULTS_CACHE_KEY_PREFIX}{organization_id}"
+
+def monitors_with_latest_key(service_id: str) -> str:
+    return f"{MONITORS_WITH_LATEST_CACHE_KEY_PREFIX}{service_id}"
+
+# ---
+# Read a cached body; Redis errors are logged and treated as a miss.
+# ---
+async def get_cached_body(key: str, ttl: int) -> Optional[str]:
+    if ttl <= 0:
+        return None
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.warning("[CACHE] Failed to read %s: %s", key, e)
+        return None
+
+# ---
+# Store an encoded body for ttl seconds; Redis errors are logged and ignored.
+# ---
+async def cache_body(key: str, body: bytes, ttl: int):
+    if ttl <= 0:
+        return
+    try:
+        await redis_client.set(key, body, ex=ttl)
+    except Exception as e:
+        logger.warning("[CACHE] Failed to store %s: %s", key, e)
+
+# ---
+# Queue removal of cached payloads on a pipeline, so callers can batch
+# invalidation with their own Redis commands.
+# ---
+def queue_latest_results_invalidation(pipe, organization_id: str):
+    pipe.delete(latest_results_key(organization_id))
+
+def queue_monitors_with_latest_invalidation(pipe, service_id: str):
+    pipe.delete(monitors_with_latest_key(service_id))
@@ -6,22 +6,22 @@
 # ---
 
 from .models import MonitorCreateRequest, MonitorResponse
-from fastapi.encoders import jsonable_encoder
 from fastapi import APIRouter, HTTPException, Query
-from statistics import median, quantiles
-from redis import asyncio as aioredis
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from datetime import datetime
 from typing import List, Optional
 from app.db import db
+from app.utils.stats_utils import median_sorted, percentiles_sorted
+import asyncio
 import logging
-import json
-import os
+import orjson
 
-from app.monitors.failure_counter_manager import (
-    clear_failed_pings,
-    clear_first_down_timestamp,
-    KEY_PREFIX,
+from app.monitors.failure_counter_manager import queue_failure_state_reset
+from app.monitors.response_cache import (
+    queue_latest_results_invalidation,
+    queue_monitors_with_latest_invalidation,
 )
+from app.monitors.redis_client import REDIS as redis_client
 
 logger = logging.getLogger(__name__)
 
@@ -31,43 +31,45 @@ logger = logging.getLogger(__name__)
 # ---
 router = APIRouter(prefix="/services/{serviceId}/monitors", tags=["Monitors"])
 
-# ---
-# Ensure Redis client uses REDIS_URL for container compatibility,
-# fallback to REDIS_PUBLIC_URL or localhost for local development.
-# ---
-redis_url = os.environ.get("REDIS_URL") or os.environ.get("REDIS_PUBLIC_URL") or "redis://localhost:6379"
-redis_client = aioredis.from_url(redis_url, decode_responses=True)
-
 # ---
 # Create a new monitor under a specific service.
-# Accepts a MonitorCreateRequest payload and inserts it into the database.
+# Accepts a MonitorCreateRequest payload and inserts it into the database,
+# copying the owning service's organizationId onto the monitor.
 # Publishes a "monitor_created" event to Redis for the worker to pick up.
 # Returns the created monitor in a consistent response structure.
 # ---
 @router.post("", response_model=MonitorResponse)
 async def create_monitor(serviceId: str, data: MonitorCreateRequest):
+    # organizationId is denormalized onto the monitor so the worker can
+    # resolve the tenant without joining through Service
+    service = await db.service.find_unique(where={"id": serviceId})
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+
     monitor = await db.monitor.create({
         "name": data.name,
         "url": str(data.url),
         "method": data.method,
         "interval": data.interval,
         "type": data.type,
-        "headers": json.dumps(jsonable_encoder(data.headers or [])),
+        "headers": orjson.dumps([h.model_dump() for h in (data.headers or [])]).decode(),
         "active": data.active,
         "degradedThreshold": data.degradedThreshold,
         "timeout": data.timeout,
         "serviceId": serviceId,
+        "organizationId": service.organizationId,
     })
 
-    confirmed_monitor = await db.monitor.find_unique(where={"id": monitor.id})
-    if not confirmed_monitor:
-        raise HTTPException(status_code=500, detail="Monitor creation failed, could not confirm persistence.")
-
+    # create() returns the committed row, so the worker can be notified
+    # straight away without re-reading it
     try:
-        await redis_client.publish("monitor_created", monitor.id)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            queue_latest_results_invalidation(pipe, service.organizationId)
+            queue_monitors_with_latest_invalidation(pipe, serviceId)
+            pipe.publish("monitor_created", monitor.id)
+            await pipe.execute()
     except Exception as e:
-        logger.error(f"[REDIS] Failed to publish 'monitor_created' for {monitor.id}: {e}")
-
+        logger.error("[REDIS] Failed to publish 'monitor_created' for %s: %s", monitor.id, e)
 
     return MonitorResponse(
         id=monitor.id,
@@ -87,32 +89,35 @@ async def create_monitor(serviceId: str, data: MonitorCreateRequest):
 
 # ---
 # Retrieve all monitors under a specific service.
-# Returns a list of monitors in a consistent response structure.
+# Returns a list of monitors in a consistent response structure. Rows come
+# from typed DB records, so they are mapped straight to plain dicts in the
+# MonitorResponse shape and returned as an ORJSONResponse; the model is
+# declared under `responses` for the OpenAPI schema only.
 # ---
-@router.get("", response_model=List[MonitorResponse])
+@router.get("", responses={200: {"model": List[MonitorResponse]}})
 async def get_monitors(serviceId: str):
     monitors = await db.monitor.find_many(
         where={"serviceId": serviceId},
         order={"createdAt": "asc"}
     )
-    return [
-        MonitorResponse(
-            id=m.id,
-            name=m.name,
-            url=m.url,
-            method=m.method,
-            interval=m.interval,
-            type=m.type,
-            headers=m.headers,
-            active=m.active,
-            degradedThreshold=m.degradedThreshold,
-            timeout=m.timeout,
-            serviceId=m.serviceId,
-            createdAt=m.createdAt.isoformat(),
-            updatedAt=m.updatedAt.isoformat(),
-        )
+    return ORJSONResponse(content=[
+        {
+            "id": m.id,
+            "name": m.name,
+            "url": m.url,
+            "method": m.method,
+            "interval": m.interval,
+            "type": m.type,
+            "headers": m.headers,
+            "active": m.active,
+            "degradedThreshold": m.degradedThreshold,
+            "timeout": m.timeout,
+            "serviceId": m.serviceId,
+            "createdAt": m.createdAt.isoformat(),
+            "updatedAt": m.updatedAt.isoformat(),
+        }
         for m in monitors
-    ]
+    ])
 
 # ---
 # Retrieve a specific monitor by its ID under a specific service.
@@ -139,9 +144,27 @@ async def get_monitor(serviceId: str, monitorId: str):
         updatedAt=monitor.updatedAt.isoformat(),
     )
 
+# ---
+# Clean up a deleted monitor's failure tracking keys, drop the cached
+# dashboard payloads of its org and service, and notify the worker to remove
+# it from the scheduler, in one pipelined round-trip. Every step is idempotent.
+# ---
+async def _redis_cleanup(monitor_id: str, service_id: str, organization_id: str):
+    async with redis_client.pipeline(transaction=False) as pipe:
+        queue_failure_state_reset(pipe, monitor_id)
+        queue_latest_results_invalidation(pipe, organization_id)
+        queue_monitors_with_latest_invalidation(pipe, service_id)
+        pipe.publish("monitor_deleted", monitor_id)
+        await pipe.execute()
+    logger.info("[CLEANUP] Redis keys deleted for monitor %s", monitor_id)
+
 # ---
 # Delete a specific monitor under a specific service.
 # Cleans up Redis failure counters and publishes a "monitor_deleted" event to Redis.
+# The Redis cleanup runs only after the DB delete has committed, so a
+# concurrent read can't re-cache the monitor and the worker is never told
+# about a delete that failed. A cleanup failure is logged rather than
+# failing a delete that already succeeded.
 # ---
 @router.delete("/{monitorId}")
 async def delete_monitor(serviceId: str, monitorId: str):
@@ -150,15 +173,10 @@ async def delete_monitor(serviceId: str, monitorId: str):
         raise HTTPException(status_code=404, detail="Monitor not found")
 
     await db.monitor.delete(where={"id": monitorId})
-
-    # Clean up Redis keys and failure tracking
-    await redis_client.delete(f"{KEY_PREFIX}{monitorId}")
-    await clear_failed_pings(monitorId)
-    await clear_first_down_timestamp(monitorId)
-    print(f"[CLEANUP] Redis keys deleted for monitor {monitorId}")
-
-    # Notify worker to remove this monitor from the scheduler
-    await redis_client.publish("monitor_deleted", monitorId)
+    try:
+        await _redis_cleanup(monitorId, serviceId, monitor.organizationId)
+    except Exception as e:
+        logger.error("[CLEANUP] Redis cleanup failed for deleted monitor %s: %s", monitorId, e)
 
     return {"success": True, "message": "Monitor deleted successfully"}
 
@@ -166,6 +184,9 @@ async def delete_monitor(serviceId: str, monitorId: str):
 # Retrieve monitoring results for a monitor under a specific service.
 # Supports optional filtering by date range and limit on the number of results.
 # Returns formatted monitoring result entries for frontend tables.
+# The rows are fetched in one query before the response starts, so a DB
+# error is still returned as a proper 5xx; only the JSON encoding is
+# streamed, by stream_monitor_results.
 # ---
 @router.get("/{monitorId}/results")
 async def get_monitor_results(
@@ -188,27 +209,72 @@ async def get_monitor_results(
 
     results = await db.monitoringresult.find_many(
         where=filters,
-        order={"checkedAt": "desc"},
-        take=limit
+        order=[{"checkedAt": "desc"}, {"id": "desc"}],
+        take=limit,
     )
 
-    return [
-        {
+    return StreamingResponse(
+        stream_monitor_results(results),
+        media_type="application/json",
+    )
+
+# ---
+# Yield already-fetched results as a JSON array, one encoded row at a time.
+# ---
+async def stream_monitor_results(results: list):
+    local_tz = datetime.now().astimezone().tzinfo
+    yield b"["
+    for i, r in enumerate(results):
+        chunk = orjson.dumps({
             "id": r.id,
-            "checkedAt": r.checkedAt.astimezone().isoformat(),
+            "checkedAt": r.checkedAt.astimezone(local_tz).isoformat(),
             "status": r.status,
             "responseTimeMs": r.responseTimeMs,
             "httpStatusCode": r.httpStatusCode,
             "error": r.error,
-        }
-        for r in results
-    ]
+        })
+        yield b"," + chunk if i else chunk
+    yield b"]"
+
+# ---
+# Stats queries for get_monitor_stats; {conditions} is filled with
+# positional-parameter predicates built in the handler.
+# - STATS_SUMMARY_SQL: counts, last ping and the sorted response times,
+#   aggregated in Postgres so individual rows never reach the app
+# - STATS_HISTORY_SQL: history graph downsampled to one point per minute,
+#   reporting the worst status seen in that minute
+# ---
+STATS_SUMMARY_SQL = """
+SELECT
+    count(*)::int AS "total",
+    (count(*) FILTER (WHERE "status" = 'DOWN'))::int AS "fails",
+    max("checkedAt") AS "lastPing",
+    to_json(
+        array_agg("responseTimeMs" ORDER BY "responseTimeMs")
+        FILTER (WHERE "responseTimeMs" IS NOT NULL)
+    ) AS "responseTimes"
+FROM "MonitoringResult"
+WHERE {conditions}
+"""
+
+STATS_HISTORY_SQL = """
+SELECT
+    date_trunc('minute', "checkedAt") AS "bucket",
+    CASE max(CASE "status" WHEN 'DOWN' THEN 2 WHEN 'DEGRADED' THEN 1 ELSE 0 END)
+        WHEN 2 THEN 'DOWN' WHEN 1 THEN 'DEGRADED' ELSE 'UP'
+    END AS "status"
+FROM "MonitoringResult"
+WHERE {conditions}
+GROUP BY 1
+ORDER BY 1 ASC
+"""
 
 # ---
 # Compute statistics for a monitor under a specific service.
 # Calculates uptime, failure count, last ping time, percentiles (p50, p75, p90, p95, p99),
-# and history graph for status over time.
+# and a per-minute history graph for status over time.
 # Used for SLA reporting and monitor dashboards.
+# Returned as an ORJSONResponse directly (plain dict payload).
 # ---
 @router.get("/{monitorId}/stats")
 async def get_monitor_stats(
@@ -221,17 +287,25 @@ async def get_monitor_stats(
     if not monitor:
         raise HTTPException(status_code=404, detail="Monitor not found.")
 
-    filters = {"monitorId": monitorId}
+    conditions = ['"monitorId" = $1']
+    params = [monitorId]
     if from_date:
-        filters["checkedAt"] = {"gte": datetime.fromisoformat(from_date)}
+        params.append(datetime.fromisoformat(from_date).isoformat())
+        conditions.append(f'"checkedAt" >= (${len(params)}::timestamptz AT TIME ZONE \'UTC\')')
     if to_date:
-        filters.setdefault("checkedAt", {}).update({"lte": datetime.fromisoformat(to_date)})
+        params.append(datetime.fromisoformat(to_date).isoformat())
+        conditions.append(f'"checkedAt" <= (${len(params)}::timestamptz AT TIME ZONE \'UTC\')')
 
-    results = await db.monitoringresult.find_many(where=filters, order={"checkedAt": "asc"})
+    where = " AND ".join(conditions)
+    summary_rows, history_rows = await asyncio.gather(
+        db.query_raw(STATS_SUMMARY_SQL.format(conditions=where), *params),
+        db.query_raw(STATS_HISTORY_SQL.format(conditions=where), *params),
+    )
+    summary = summary_rows[0]
 
-    total_pings = len(results)
+    total_pings = summary["total"]
     if total_pings == 0:
-        return {
+        return ORJSONResponse(content={
             "uptime": 0,
             "failures": 0,
             "lastPing": None,
@@ -242,31 +316,31 @@ async def get_monitor_stats(
             "p95": None,
             "p99": None,
             "historyGraph": [],
-        }
+        })
 
-    fails = sum(1 for r in results if r.status == "DOWN")
-    uptime_percentage = round(((total_pings - fails) / total_pings) * 100, 2)
+    # Resolve the local zone once rather than on every astimezone() call
+    local_tz = datetime.now().astimezone().tzinfo
 
-    response_times = [r.responseTimeMs for r in results if r.responseTimeMs is not None]
-    response_times_sorted = sorted(response_times)
+    fails = summary["fails"]
+    uptime_percentage = round(((total_pings - fails) / total_pings) * 100, 2)
 
-    p50 = median(response_times_sorted) if response_times_sorted else None
-    p75, p90, p95, p99 = [None]*4
-    if response_times_sorted:
-        qs = quantiles(response_times_sorted, n=100)
-        p75 = qs[74]
-        p90 = qs[89]
-        p95 = qs[94]
-        p99 = qs[98]
+    # Response times arrive sorted from Postgres; percentiles keep the
+    # statistics.quantiles "exclusive" method via the sorted helpers
+    response_times = summary["responseTimes"] or []
+    p50 = median_sorted(response_times)
+    p75, p90, p95, p99 = percentiles_sorted(response_times, (75, 90, 95, 99))
 
-    last_ping = results[-1].checkedAt.astimezone().isoformat()
+    last_ping = datetime.fromisoformat(summary["lastPing"]).astimezone(local_tz).isoformat()
 
     history_graph = [
-        {"timestamp": r.checkedAt.astimezone().isoformat(), "status": r.status}
-        for r in results
+        {
+            "timestamp": datetime.fromisoformat(r["bucket"]).astimezone(local_tz).isoformat(),
+            "status": r["status"],
+        }
+        for r in history_rows
     ]
 
-    return {
+    return ORJSONResponse(content={
         "uptime": uptime_percentage,
         "failures": fails,
         "lastPing": last_ping,
@@ -277,4 +351,4 @@ async def get_monitor_stats(
         "p95": p95,
         "p99": p99,
         "historyGraph": history_graph,
-    }
+    })
@@ -4,10 +4,25 @@
 # ---
 
 from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi.responses import Response
 from app.db import db
+from app.monitors.failure_counter_manager import queue_failure_state_reset
+from app.monitors.redis_client import REDIS as redis_client
+from app.monitors.response_cache import (
+    MONITORS_WITH_LATEST_CACHE_TTL_SECONDS,
+    cache_body,
+    get_cached_body,
+    monitors_with_latest_key,
+    queue_latest_results_invalidation,
+    queue_monitors_with_latest_invalidation,
+)
 from .models import ServiceCreateRequest, ServiceUpdateRequest, ServiceResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
@@ -20,14 +35,17 @@ router = APIRouter(prefix="/services", tags=["Services"])
 @router.post("", response_model=ServiceResponse)
 async def create_service(data: ServiceCreateRequest):
     try:
-        service = await db.service.create({
-            "name": data.name,
-            "status": data.status or "OPERATIONAL",
-            "organizationId": data.organizationId,
-            "description": data.description,
-        })
-
-        organization = await db.organization.find_unique(where={"id": data.organizationId})
+        # The organization is loaded with the insert so its name needs no second query
+        service = await db.service.create(
+            data={
+                "name": data.name,
+                "status": data.status or "OPERATIONAL",
+                "organizationId": data.organizationId,
+                "description": data.description,
+            },
+            include={"organization": True},
+        )
+        organization = service.organization
 
         return ServiceResponse(
             id=service.id,
@@ -99,6 +117,9 @@ async def get_service(serviceId: str):
 # Update a service by its serviceId.
 # Accepts partial update data (name, status, description),
 # applies the updates, and returns the updated service with organization name.
+# Afterwards drops the cached dashboard payloads that embed the service name
+# and publishes "service_updated" so the monitor worker refreshes the service
+# in the payloads it sends.
 # Raises 404 if the service does not exist.
 # ---
 @router.patch("/{serviceId}", response_model=ServiceResponse)
@@ -121,6 +142,16 @@ async def update_service(serviceId: str, data: ServiceUpdateRequest):
         data=updated_data,
         include={"organization": True}
     )
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            queue_monitors_with_latest_invalidation(pipe, serviceId)
+            queue_latest_results_invalidation(pipe, updated_service.organizationId)
+            pipe.publish("service_updated", serviceId)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("[CACHE] Failed to publish update for service %s: %s", serviceId, e)
+
     return ServiceResponse(
         id=updated_service.id,
         name=updated_service.name,
@@ -134,35 +165,33 @@ async def update_service(serviceId: str, data: ServiceUpdateRequest):
 
 # ---
 # Delete a service by its serviceId.
-# Cleans up by:
-# - Deleting monitoring results for monitors under the service
-# - Deleting monitors under the service
-# - Finally deleting the service itself
+# Monitors (Monitor.service) and their monitoring results
+# (MonitoringResult.monitor) are declared onDelete: Cascade in schema.prisma,
+# so one delete removes them at the DB level. delete() returns None when no
+# service matched, which doubles as the existence check; the included
+# monitors are read before the delete, so the cascaded monitors are known.
+# Afterwards, like delete_monitor, each cascaded monitor's failure state is
+# reset and "monitor_deleted" published so the worker stops pinging it.
 # Returns a success response upon completion.
 # ---
 @router.delete("/{serviceId}")
 async def delete_service(serviceId: str):
-    service = await db.service.find_unique(where={"id": serviceId})
+    service = await db.service.delete(where={"id": serviceId}, include={"monitors": True})
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    # Get all monitor IDs under this service
-    monitors = await db.monitor.find_many(
-        where={"serviceId": serviceId}
-    )
-    monitor_ids = [monitor.id for monitor in monitors]
-
-    # Delete related MonitoringResults first
-    if monitor_ids:
-        await db.monitoringresult.delete_many(
-            where={"monitorId": {"in": monitor_ids}}
-        )
-
-    # Delete related monitors
-    await db.monitor.delete_many(where={"serviceId": serviceId})
-
-    # Finally, delete the service
-    await db.service.delete(where={"id": serviceId})
+    monitor_ids = [monitor.id for monitor in service.monitors or []]
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for monitor_id in monitor_ids:
+                queue_failure_state_reset(pipe, monitor_id)
+                pipe.publish("monitor_deleted", monitor_id)
+            # Drop cached dashboard payloads that still list the deleted monitors
+            queue_monitors_with_latest_invalidation(pipe, serviceId)
+            queue_latest_results_invalidation(pipe, service.organizationId)
+            await pipe.execute()
+    except Exception as e:
+        logger.error("[CLEANUP] Redis cleanup failed for deleted service %s: %s", serviceId, e)
 
     return {"success": True}
 
@@ -191,49 +220,75 @@ class MonitorWithLatestResponse(BaseModel):
     updatedAt: str
     latestResult: Optional[MonitorLatestResult]
 
+# ---
+# Every monitor of a service joined with its most recent MonitoringResult in
+# one query (LATERAL ... LIMIT 1, served by the (monitorId, checkedAt DESC)
+# index), instead of a per-monitor take:1 lookup.
+# ---
+MONITORS_WITH_LATEST_SQL = """
+SELECT
+    m."id", m."name", m."url", m."method", m."interval", m."type", m."headers",
+    m."active", m."degradedThreshold", m."timeout", m."serviceId",
+    m."createdAt", m."updatedAt",
+    mr."status", mr."responseTimeMs", mr."httpStatusCode", mr."checkedAt", mr."error"
+FROM "Monitor" m
+LEFT JOIN LATERAL (
+    SELECT r."status", r."responseTimeMs", r."httpStatusCode", r."checkedAt", r."error"
+    FROM "MonitoringResult" r
+    WHERE r."monitorId" = m."id"
+    ORDER BY r."checkedAt" DESC
+    LIMIT 1
+) mr ON true
+WHERE m."serviceId" = $1
+ORDER BY m."createdAt" ASC
+"""
+
 # ---
 # Retrieve all monitors under a specific service,
 # each with its latest monitoring result attached if available.
 # Returns a list of monitors with their current status, response time, and other metadata.
+# DateTime values come back from the raw query as ISO-8601 strings.
+# The encoded body is cached briefly in Redis (app/monitors/response_cache.py)
+# and served as-is on hits; the model is declared under `responses` for the
+# OpenAPI schema only.
 # ---
-@router.get("/{serviceId}/monitors-with-latest", response_model=List[MonitorWithLatestResponse])
+@router.get("/{serviceId}/monitors-with-latest", responses={200: {"model": List[MonitorWithLatestResponse]}})
 async def get_monitors_with_latest(serviceId: str = Path(...)):
+    cache_key = monitors_with_latest_key(serviceId)
+    cached = await get_cached_body(cache_key, MONITORS_WITH_LATEST_CACHE_TTL_SECONDS)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
     try:
-        monitors = await db.monitor.find_many(
-            where={"serviceId": serviceId},
-            include={
-                "monitoringResults": {
-                    "orderBy": {"checkedAt": "desc"},
-                    "take": 1,
-                }
-            },
-            order={"createdAt": "asc"}
-        )
+        rows = await db.query_raw(MONITORS_WITH_LATEST_SQL, serviceId)
 
-        return [
-            MonitorWithLatestResponse(
-                id=m.id,
-                name=m.name,
-                url=m.url,
-                method=m.method,
-                interval=m.interval,
-                type=m.type,
-                headers=m.headers,
-                active=m.active,
-                degradedThreshold=m.degradedThreshold,
-                timeout=m.timeout,
-                serviceId=m.serviceId,
-                createdAt=m.createdAt.isoformat(),
-                updatedAt=m.updatedAt.isoformat(),
-                latestResult=MonitorLatestResult(
-                    status=latest.status,
-                    responseTimeMs=latest.responseTimeMs,
-                    httpStatusCode=latest.httpStatusCode,
-                    checkedAt=latest.checkedAt.isoformat() if latest.checkedAt else None,
-                    error=latest.error,
-                ) if (latest := (m.monitoringResults[0] if m.monitoringResults else None)) else None
-            )
-            for m in monitors
-        ]
+        body = orjson.dumps([
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "url": row["url"],
+                "method": row["method"],
+                "interval": row["interval"],
+                "type": row["type"],
+                "headers": row["headers"],
+                "active": row["active"],
+                "degradedThreshold": row["degradedThreshold"],
+                "timeout": row["timeout"],
+                "serviceId": row["serviceId"],
+                "createdAt": row["createdAt"],
+                "updatedAt": row["updatedAt"],
+                "latestResult": {
+                    "status": row["status"],
+                    "responseTimeMs": row["responseTimeMs"],
+                    "httpStatusCode": row["httpStatusCode"],
+                    "checkedAt": row["checkedAt"],
+                    "error": row["error"],
+                } if row["checkedAt"] is not None else None,
+            }
+            for row in rows
+        ])
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    await cache_body(cache_key, body, MONITORS_WITH_LATEST_CACHE_TTL_SECONDS)
+    return Response(content=body, media_type="application/json")
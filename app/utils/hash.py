@@ -1,23 +1,56 @@
 # ---
 # File: utils/hash.py
-# Purpose: Password hashing and verification utilities using bcrypt
+# Purpose: Password hashing and verification utilities using Argon2 (bcrypt kept for legacy hashes)
 # ---
 
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import bcrypt
+import os
 
-# Initialize the password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# ---
+# Argon2 work factors, overridable per deployment so a single verify can be
+# tuned to the target hardware (aim for roughly 250-500ms per hash).
+# ---
+ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", "2"))
+
+# ---
+# Initialize the Argon2 hasher (argon2-cffi native bindings) directly,
+# without a passlib CryptContext in front of it. New hashes are Argon2id in
+# the standard PHC format, the same format passlib produced, so existing
+# Argon2 hashes verify unchanged.
+# ---
+password_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+    hash_len=32,
+)
+
+# Prefixes of legacy bcrypt hashes, verified with the bcrypt package
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
 
 # ---
-# Hash a plain text password using bcrypt.
+# Hash a plain text password using Argon2.
 # Returns the hashed password as a string for secure storage.
 # ---
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 # ---
 # Verify a plain text password against a previously hashed password.
+# Accepts both Argon2 and legacy bcrypt hashes.
 # Returns True if the password matches, False otherwise.
 # ---
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith(BCRYPT_PREFIXES):
+        try:
+            return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+        except ValueError:
+            return False
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
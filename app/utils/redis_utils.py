@@ -3,22 +3,102 @@
 # Purpose: Redis utilities for publishing messages to channels asynchronously
 # ---
 
-from redis import asyncio as aioredis
-import json
-import os
+import asyncio
+import logging
+import orjson
 
-# Redis connection URL and client initialization for async publishing
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost")
-redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+# Publishes go through the process-wide client shared with the monitor modules
+from app.monitors.redis_client import REDIS as redis_client
+
+logger = logging.getLogger(__name__)
+
+# ---
+# Monitor updates are published on one channel per organization so WebSocket
+# servers can route them by channel name without decoding the payload.
+# ---
+MONITOR_UPDATES_CHANNEL_PREFIX = "monitor_updates:"
+
+def monitor_updates_channel(organization_id: str) -> str:
+    return MONITOR_UPDATES_CHANNEL_PREFIX + organization_id
+
+# ---
+# Batched publishing settings
+# - PUBLISH_QUEUE_MAXSIZE: pending messages kept before new ones are dropped
+# - PUBLISH_BATCH_SIZE: max messages sent in one pipeline
+# - PUBLISH_BATCH_WINDOW_SECONDS: how long a batch waits to fill after its first message
+# - PUBLISH_DRAIN_TIMEOUT_SECONDS: how long shutdown waits for queued messages to go out
+# ---
+PUBLISH_QUEUE_MAXSIZE = 10000
+PUBLISH_BATCH_SIZE = 100
+PUBLISH_BATCH_WINDOW_SECONDS = 0.05
+PUBLISH_DRAIN_TIMEOUT_SECONDS = 5.0
+
+_publish_queue: asyncio.Queue = asyncio.Queue(maxsize=PUBLISH_QUEUE_MAXSIZE)
+
+# Queued by stop_publish_batcher(); everything queued before it is still published
+_STOP = object()
 
 # ---
-# Publish a dictionary payload as a JSON string to a specified Redis channel.
-# Handles exceptions gracefully and logs failures for visibility during development.
+# Queue a payload for publishing without waiting on Redis.
+# Payloads are serialized with orjson (datetimes render as ISO-8601).
+# Messages are sent by publish_batcher(); if the queue is full the
+# message is dropped and logged rather than blocking the caller.
 # ---
-async def publish_to_redis(channel: str, payload: dict):
-    message = json.dumps(payload)
+def publish_nowait(channel: str, payload: dict):
+    try:
+        _publish_queue.put_nowait((channel, payload))
+    except asyncio.QueueFull:
+        logger.warning("[REDIS] Publish queue full, dropping message for %s", channel)
+
+# ---
+# Background consumer for publish_nowait().
+# Waits for a message, collects more for up to PUBLISH_BATCH_WINDOW_SECONDS
+# (or PUBLISH_BATCH_SIZE messages), then sends them in one pipelined round-trip.
+# Runs until it reads the stop sentinel (see stop_publish_batcher) or is cancelled.
+# ---
+async def publish_batcher():
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await _publish_queue.get()
+        if item is _STOP:
+            return
+        batch = [item]
+        deadline = loop.time() + PUBLISH_BATCH_WINDOW_SECONDS
+        while len(batch) < PUBLISH_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_publish_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for channel, payload in batch:
+                    pipe.publish(channel, orjson.dumps(payload))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("[REDIS] Failed to publish batch of %d messages: %s", len(batch), e)
+
+# ---
+# Shutdown helper: lets the batcher publish everything already queued, then
+# waits for it to exit. Gives up after `timeout` seconds (e.g. Redis is
+# down) and cancels it, dropping whatever is left.
+# ---
+async def stop_publish_batcher(task: asyncio.Task, timeout: float = PUBLISH_DRAIN_TIMEOUT_SECONDS):
+    async def drain():
+        await _publish_queue.put(_STOP)
+        await task
+
     try:
-        subscribers = await redis_client.publish(channel, message)
-        # print(f"[REDIS] Published to {channel} | Subscribers: {subscribers}")
-    except Exception as e:
-        print(f"[REDIS] Failed to publish to {channel}: {e}")
+        await asyncio.wait_for(drain(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("[REDIS] Publish queue not drained within %ss, dropping remaining messages", timeout)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
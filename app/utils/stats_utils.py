@@ -0,0 +1,41 @@
+# ---
+# File: app/utils/stats_utils.py
+# Purpose: Percentile helpers for monitor response-time statistics
+# ---
+
+# ---
+# Compute selected percentiles of already-sorted data.
+# Matches statistics.quantiles(data, n=100) (default "exclusive" method)
+# at the requested cut points, but only computes those points and does not
+# re-sort the input. A single data point is returned for every percentile.
+# Returns a list of None values when data is empty.
+# ---
+def percentiles_sorted(sorted_data: list, points: tuple[int, ...]) -> list:
+    ld = len(sorted_data)
+    if ld == 0:
+        return [None] * len(points)
+    if ld == 1:
+        return [sorted_data[0]] * len(points)
+
+    n = 100
+    m = ld + 1
+    result = []
+    for i in points:
+        j = i * m // n
+        j = 1 if j < 1 else ld - 1 if j > ld - 1 else j
+        delta = i * m - j * n
+        result.append((sorted_data[j - 1] * (n - delta) + sorted_data[j] * delta) / n)
+    return result
+
+# ---
+# Median of already-sorted data (same result as statistics.median).
+# Returns None when data is empty.
+# ---
+def median_sorted(sorted_data: list):
+    ld = len(sorted_data)
+    if ld == 0:
+        return None
+    mid = ld // 2
+    if ld % 2:
+        return sorted_data[mid]
+    return (sorted_data[mid - 1] + sorted_data[mid]) / 2
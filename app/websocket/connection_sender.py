@@ -0,0 +1,48 @@
+# ---
+# File: app/websocket/connection_sender.py
+# Purpose: Per-connection outbound queue and sender task for WebSocket fan-out,
+#          so broadcasting never waits on a slow client.
+# ---
+
+from fastapi import WebSocket
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pending messages kept per connection; the oldest is dropped when full
+SEND_QUEUE_MAXSIZE = 64
+
+# ---
+# Owns one WebSocket's outbound queue and the task draining it.
+# Broadcasters call enqueue() (never blocks); the sender task writes frames
+# in order and calls on_error(websocket) once if a send fails.
+# ---
+class ConnectionSender:
+    def __init__(self, websocket: WebSocket, on_error):
+        self.websocket = websocket
+        self.on_error = on_error
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+        self.task = asyncio.create_task(self._run())
+
+    def enqueue(self, payload: str):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Client is not keeping up: drop its oldest pending message
+            self.queue.get_nowait()
+            self.queue.put_nowait(payload)
+
+    async def _run(self):
+        while True:
+            payload = await self.queue.get()
+            try:
+                await self.websocket.send_text(payload)
+            except Exception as e:
+                logger.error("[WS] Failed to send message: %s", e)
+                self.on_error(self.websocket)
+                return
+
+    def close(self):
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
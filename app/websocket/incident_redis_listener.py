@@ -0,0 +1,42 @@
+# ---
+# File: app/websocket/incident_redis_listener.py
+# Purpose: Single process-wide Redis subscriber that broadcasts incident updates
+#          to the incident WebSocket clients of each organization.
+# ---
+
+import orjson
+import logging
+from app.websocket.incidents_ws_router import manager
+from app.websocket.redis_listener import listen_forever
+
+# Configure module-level logger
+logger = logging.getLogger(__name__)
+
+INCIDENT_UPDATES_CHANNEL = "incident_updates_channel"
+
+# ---
+# Forward one incident update to the organization's WebSocket clients.
+# ---
+async def _forward_incident_update(channel: str, raw: str):
+    try:
+        data = orjson.loads(raw)
+        organization_id = data.get("organization_id")
+        if organization_id:
+            # Forward the payload as published; it is already JSON
+            await manager.broadcast_text(organization_id, raw)
+        else:
+            logger.warning("[Incident Listener] Missing organization_id: %r", data)
+    except Exception as e:
+        logger.error("[Incident Listener] Failed to process message: %s", e)
+
+async def incident_redis_listener():
+    """
+    Subscribes to 'incident_updates_channel' in Redis once per process and
+    forwards each message to the connected incident WebSocket clients of its
+    organization, so messages are received and decoded once rather than once
+    per connection.
+    """
+    try:
+        await listen_forever(INCIDENT_UPDATES_CHANNEL, _forward_incident_update, "Incident Listener")
+    finally:
+        logger.info("[Incident Listener] Cleanly shut down")
@@ -1,21 +1,20 @@
 # ---
 # File: app/websocket/incidents_ws_router.py
-# Purpose: WebSocket router for real-time incident updates via Redis pub/sub per organization
+# Purpose: WebSocket router for real-time incident updates per organization
+# (fed by app/websocket/incident_redis_listener.py)
 # ---
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from redis import asyncio as aioredis
-import asyncio
-import json
+from fastapi import APIRouter, WebSocket
+from collections import defaultdict
+from typing import Dict, Set
+from app.websocket.connection_sender import ConnectionSender
 import logging
-import os
+import orjson
 
 # print("[WS Router] incidents_ws_router imported and registered.")
 
 router = APIRouter()
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost")
-
 logger = logging.getLogger(__name__)
 
 # ---
@@ -25,84 +24,72 @@ logger = logging.getLogger(__name__)
 # ---
 class IncidentWSManager:
     def __init__(self):
-        self.active_connections = {}
+        # Maps organization_id -> set of active WebSockets (O(1) add/discard).
+        # Only connect() indexes it directly; lookups use .get() so they
+        # don't create empty entries.
+        self.active_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
+        # Reverse index WebSocket -> organization_id, so a failing socket can
+        # be removed without the caller knowing its organization
+        self.ws_to_org: Dict[WebSocket, str] = {}
+        # Outbound queue + sender task per WebSocket (see connection_sender.py)
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
 
     async def connect(self, websocket: WebSocket, organization_id: str):
         await websocket.accept()
-        self.active_connections.setdefault(organization_id, []).append(websocket)
-        logger.info(f"[WS] Incident connected: {organization_id}")
+        self.active_connections[organization_id].add(websocket)
+        self.ws_to_org[websocket] = organization_id
+        self.senders[websocket] = ConnectionSender(websocket, self.disconnect_by_ws)
+        logger.info("[WS] Incident connected: %s", organization_id)
 
     def disconnect(self, websocket: WebSocket, organization_id: str):
-        connections = self.active_connections.get(organization_id, [])
+        self.ws_to_org.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
+        connections = self.active_connections.get(organization_id, set())
         if websocket in connections:
-            connections.remove(websocket)
-            logger.info(f"[WS] Incident disconnected: {organization_id}")
+            connections.discard(websocket)
+            logger.info("[WS] Incident disconnected: %s", organization_id)
         if not connections:
             self.active_connections.pop(organization_id, None)
 
+    # Removes a socket using the reverse index; no-op if it is already gone.
+    def disconnect_by_ws(self, websocket: WebSocket):
+        organization_id = self.ws_to_org.get(websocket)
+        if organization_id is not None:
+            self.disconnect(websocket, organization_id)
+
     async def broadcast(self, organization_id: str, message: dict):
-        connections = self.active_connections.get(organization_id, [])
-        for connection in connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"[WS] Send error: {e}")
-                self.disconnect(connection, organization_id)
+        await self.broadcast_text(organization_id, orjson.dumps(message).decode())
+
+    # Queues an already-encoded JSON payload for every client of the
+    # organization; serialized once per broadcast, not once per connection.
+    async def broadcast_text(self, organization_id: str, payload: str):
+        # Hand the payload to each client's sender; a slow client only
+        # backs up its own queue
+        for connection in self.active_connections.get(organization_id, set()):
+            sender = self.senders.get(connection)
+            if sender is not None:
+                sender.enqueue(payload)
 
 manager = IncidentWSManager()
 
 # ---
 # WebSocket endpoint for subscribing to incident updates for a specific organization.
-# - Accepts a WebSocket connection.
-# - Subscribes to the Redis 'incident_updates_channel'.
-# - Filters and broadcasts messages to the client if the organization matches.
-# - Handles client disconnects and cleanup gracefully.
+# - Accepts a WebSocket connection and registers it with the manager.
+# - Messages are pushed by the process-wide incident_redis_listener, which
+#   broadcasts each Redis message to the matching organization's connections.
+# - Reads client messages (pings/control) only to detect disconnects.
 # ---
 @router.websocket("/ws/incidents/{organization_id}")
 async def incident_websocket(websocket: WebSocket, organization_id: str):
-    # print(f"[IncidentSocket] New connection for org: {organization_id}")
     await manager.connect(websocket, organization_id)
-
-    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("incident_updates_channel")
-    # print(f"[IncidentSocket] Subscribed to Redis channel for {organization_id}")
-
     try:
+        # Clients only listen; drain inbound events without decoding them
+        # until the disconnect. Dead peers are caught by uvicorn's ping frames.
         while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
-            if message:
-                try:
-                    data = json.loads(message["data"])
-                    # print(f"[IncidentSocket] Raw Redis message: {data}")
-
-                    if data.get("organization_id") == organization_id:
-                        # print(f"[IncidentSocket] Broadcasting to org {organization_id}")
-                        await manager.broadcast(organization_id, data)
-                    else:
-                        # print(f"[IncidentSocket] Ignored message for org {data.get('organization_id')}")
-                        pass
-                except json.JSONDecodeError as e:
-                    # print(f"[IncidentSocket] JSON decode error: {e}, raw: {message['data']}")
-                    pass
-                except Exception as e:
-                    # print(f"[IncidentSocket] Failed processing message: {e}")
-                    pass
-
-            # Handle optional ping/control messages to keep connection alive
-            try:
-                await websocket.receive_text()
-            except WebSocketDisconnect:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
                 break
-
-            await asyncio.sleep(0.1)
-
-    except WebSocketDisconnect:
-        # print(f"[IncidentSocket] Disconnected: {organization_id}")
-        pass
     finally:
         manager.disconnect(websocket, organization_id)
-        await pubsub.unsubscribe("incident_updates_channel")
-        await pubsub.close()
-        await redis_client.close()
-        # print(f"[IncidentSocket] Cleaned up for {organization_id}")
@@ -3,44 +3,74 @@
 # Purpose: WebSocket router for real-time monitor updates per organization with Redis pub/sub for distributed scaling
 # ---
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from fastapi import APIRouter, WebSocket
+from collections import defaultdict
+from typing import Dict, Set
+from app.websocket.connection_sender import ConnectionSender
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 class ConnectionManager:
     def __init__(self):
-        # Maps organization_id -> list of active WebSockets
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Maps organization_id -> set of active WebSockets (O(1) add/discard).
+        # Only connect() indexes it directly; lookups use .get() so they
+        # don't create empty entries.
+        self.active_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
+        # Reverse index WebSocket -> organization_id, so a failing socket can
+        # be removed without the caller knowing its organization
+        self.ws_to_org: Dict[WebSocket, str] = {}
+        # Outbound queue + sender task per WebSocket (see connection_sender.py)
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
 
     async def connect(self, websocket: WebSocket, organization_id: str):
         await websocket.accept()
-        if organization_id not in self.active_connections:
-            self.active_connections[organization_id] = []
-        self.active_connections[organization_id].append(websocket)
-        logger.info(f"[WS] Connected for {organization_id} | Total: {len(self.active_connections[organization_id])}")
+        connections = self.active_connections[organization_id]
+        connections.add(websocket)
+        self.ws_to_org[websocket] = organization_id
+        self.senders[websocket] = ConnectionSender(websocket, self.disconnect_by_ws)
+        logger.info("[WS] Connected for %s | Total: %d", organization_id, len(connections))
 
     def disconnect(self, websocket: WebSocket, organization_id: str):
-        if organization_id in self.active_connections and websocket in self.active_connections[organization_id]:
-            self.active_connections[organization_id].remove(websocket)
-            logger.info(f"[WS] Disconnected for {organization_id} | Remaining: {len(self.active_connections[organization_id])}")
+        self.ws_to_org.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
+        connections = self.active_connections.get(organization_id)
+        if connections is not None and websocket in connections:
+            connections.discard(websocket)
+            logger.info("[WS] Disconnected for %s | Remaining: %d", organization_id, len(connections))
+            if not connections:
+                self.active_connections.pop(organization_id, None)
+
+    # Removes a socket using the reverse index; no-op if it is already gone.
+    def disconnect_by_ws(self, websocket: WebSocket):
+        organization_id = self.ws_to_org.get(websocket)
+        if organization_id is not None:
+            self.disconnect(websocket, organization_id)
 
     async def broadcast(self, organization_id: str, message: dict):
-        connections = self.active_connections.get(organization_id, [])
+        await self.broadcast_text(organization_id, orjson.dumps(message).decode())
+
+    # Queues an already-encoded JSON payload as a text frame for every client of
+    # the organization, so a message is serialized once per broadcast rather
+    # than once per connection.
+    async def broadcast_text(self, organization_id: str, payload: str):
+        connections = self.active_connections.get(organization_id)
         if not connections:
-            logger.info(f"[WS] No clients to broadcast for {organization_id}")
+            logger.debug("[WS] No clients to broadcast for %s", organization_id)
             return
 
-        logger.info(f"[WS] Broadcasting to {len(connections)} clients for {organization_id}")
+        logger.debug("[WS] Broadcasting to %d clients for %s", len(connections), organization_id)
 
-        for connection in connections.copy():
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"[WS] Failed to send message: {e}")
-                self.disconnect(connection, organization_id)
+        # Hand the payload to each client's sender; a slow client only
+        # backs up its own queue
+        for connection in connections:
+            sender = self.senders.get(connection)
+            if sender is not None:
+                sender.enqueue(payload)
 
 # Singleton manager instance for use in listener and WS route
 manager = ConnectionManager()
@@ -49,7 +79,11 @@ manager = ConnectionManager()
 async def monitor_updates_websocket(websocket: WebSocket, organization_id: str):
     await manager.connect(websocket, organization_id)
     try:
+        # Clients only listen; drain inbound events without decoding them
+        # until the disconnect. Dead peers are caught by uvicorn's ping frames.
         while True:
-            await websocket.receive_text()  # Keeps connection alive
-    except WebSocketDisconnect:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                break
+    finally:
         manager.disconnect(websocket, organization_id)
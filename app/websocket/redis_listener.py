@@ -5,9 +5,11 @@
 # ---
 
 from redis import asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+import asyncio
 import os
-import json
 import logging
+from app.utils.redis_utils import MONITOR_UPDATES_CHANNEL_PREFIX
 from app.websocket.monitor_updates import manager
 
 # Configure module-level logger
@@ -21,33 +23,83 @@ logger = logging.getLogger(__name__)
 # ---
 REDIS_URL = os.getenv("REDIS_URL") or os.getenv("REDIS_PUBLIC_URL") or "redis://localhost:6379"
 
+# ---
+# Process-wide client for the WebSocket pub/sub listeners.
+# Created once so listener restarts reuse the pool instead of building a new
+# client; health_check_interval PINGs idle connections so a dead socket is
+# noticed and replaced. TCP keepalive covers the long idle stretches of a
+# subscribed connection, and the larger read size lets a burst of published
+# messages arrive in fewer recv calls. Closed from the app shutdown handler.
+# ---
+_pubsub_pool = aioredis.ConnectionPool.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    health_check_interval=30,
+    max_connections=16,
+    socket_keepalive=True,
+    socket_read_size=65536,
+)
+pubsub_client = aioredis.Redis(connection_pool=_pubsub_pool)
+
+# Reconnect backoff after a lost Redis connection (doubles up to the max)
+RECONNECT_BACKOFF_INITIAL_SECONDS = 1.0
+RECONNECT_BACKOFF_MAX_SECONDS = 30.0
+
+# ---
+# Subscribe to a channel (or a glob pattern when pattern=True) and pass each
+# message's channel name and data to on_message(channel, data).
+# On Redis connection errors the subscription is rebuilt with exponential
+# backoff; other errors propagate to the caller (the app supervisor).
+# ---
+async def listen_forever(channel: str, on_message, name: str, pattern: bool = False):
+    delay = RECONNECT_BACKOFF_INITIAL_SECONDS
+    message_type = "pmessage" if pattern else "message"
+    while True:
+        pubsub = pubsub_client.pubsub()
+        try:
+            if pattern:
+                await pubsub.psubscribe(channel)
+            else:
+                await pubsub.subscribe(channel)
+            logger.info("[%s] Subscribed to '%s'", name, channel)
+            delay = RECONNECT_BACKOFF_INITIAL_SECONDS
+            async for message in pubsub.listen():
+                if message["type"] == message_type:
+                    await on_message(message["channel"], message["data"])
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            logger.warning("[%s] Redis connection lost: %s; reconnecting in %.0fs", name, e, delay)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECONNECT_BACKOFF_MAX_SECONDS)
+
+# ---
+# Forward one monitor update to the organization's WebSocket clients.
+# The organization comes from the channel name, so the payload is passed
+# through as published without being decoded.
+# ---
+async def _forward_monitor_update(channel: str, raw: str):
+    organization_id = channel[len(MONITOR_UPDATES_CHANNEL_PREFIX):]
+    if organization_id:
+        await manager.broadcast_text(organization_id, raw)
+    else:
+        logger.warning("[Redis Listener] Update on '%s' has no organization id", channel)
+
 async def redis_listener():
     """
-    Subscribes to 'monitor_updates_channel' in Redis and
-    forwards messages to connected WebSocket clients per organization.
+    Subscribes to the per-organization 'monitor_updates:{organization_id}'
+    channels in Redis and forwards messages to connected WebSocket clients
+    of that organization.
     """
-    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("monitor_updates_channel")
-    logger.info("[Redis Listener] Subscribed to 'monitor_updates_channel'")
-
     try:
-        async for message in pubsub.listen():
-            if message["type"] == "message":
-                try:
-                    data = json.loads(message["data"])
-                    organization_id = data.get("organization_id")
-                    if organization_id:
-                        logger.info(f"[Redis Listener] Received update for {organization_id}")
-                        await manager.broadcast(organization_id, data)
-                    else:
-                        logger.warning(f"[Redis Listener] Missing organization_id: {data}")
-                except Exception as e:
-                    logger.error(f"[Redis Listener] Failed to process message: {e}")
-    except Exception as e:
-        logger.error(f"[Redis Listener] Listener error: {e}")
+        await listen_forever(
+            MONITOR_UPDATES_CHANNEL_PREFIX + "*",
+            _forward_monitor_update,
+            "Redis Listener",
+            pattern=True,
+        )
     finally:
-        await pubsub.unsubscribe("monitor_updates_channel")
-        await pubsub.close()
-        await redis_client.close()
         logger.info("[Redis Listener] Cleanly shut down")
@@ -0,0 +1,17 @@
+-- AlterTable
+ALTER TABLE "Monitor" ADD COLUMN "organizationId" TEXT;
+
+-- Backfill from the owning service
+UPDATE "Monitor" AS m
+SET "organizationId" = s."organizationId"
+FROM "Service" AS s
+WHERE m."serviceId" = s."id";
+
+-- AlterTable
+ALTER TABLE "Monitor" ALTER COLUMN "organizationId" SET NOT NULL;
+
+-- CreateIndex
+CREATE INDEX "Monitor_organizationId_idx" ON "Monitor"("organizationId");
+
+-- AddForeignKey
+ALTER TABLE "Monitor" ADD CONSTRAINT "Monitor_organizationId_fkey" FOREIGN KEY ("organizationId") REFERENCES "Organization"("id") ON DELETE CASCADE ON UPDATE CASCADE;
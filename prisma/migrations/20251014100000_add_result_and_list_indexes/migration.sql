@@ -0,0 +1,8 @@
+-- CreateIndex
+CREATE INDEX "Service_organizationId_createdAt_idx" ON "Service"("organizationId", "createdAt");
+
+-- CreateIndex
+CREATE INDEX "Monitor_serviceId_idx" ON "Monitor"("serviceId");
+
+-- CreateIndex
+CREATE INDEX "MonitoringResult_monitorId_checkedAt_idx" ON "MonitoringResult"("monitorId", "checkedAt" DESC);
@@ -12,4 +12,4 @@ python -m prisma migrate deploy
 python -m app.monitors.auto_incident_monitor &
 
 # Start the API server in the foreground so the container stays alive.
-exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}"
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}" --loop uvloop --http httptools --no-access-log
@@ -6,50 +6,53 @@ async def main():
     db = Prisma()
     await db.connect()
 
-    # 1. Ensure organization exists (by domain, for multi-tenant)
     org_domain = "achme.ai"
     org_name = "Achme"
-
-    org = await db.organization.find_unique(where={"domain": org_domain})
-    if not org:
-        org = await db.organization.create({
-            "name": org_name,
-            "domain": org_domain,
-        })
-        print(f"Organization created: {org.name} ({org.id})")
-    else:
-        print(f"Organization already exists: {org.name} ({org.id})")
-
-    # 2. Remove admin and user if they exist (idempotent)
     admin_email = "admin@achme.ai"
     user_email = "user@achme.ai"
-    for email in [admin_email, user_email]:
-        old = await db.user.find_first(where={
-            "email": email,
+
+    # Both seed users share a password: hash it once (argon2 is deliberately
+    # slow), outside the transaction so it doesn't hold it open
+    seed_password = hash_password("12121212")
+
+    async with db.tx() as tx:
+        # 1. Ensure organization exists (by domain, for multi-tenant)
+        org = await tx.organization.upsert(
+            where={"domain": org_domain},
+            data={
+                "create": {"name": org_name, "domain": org_domain},
+                "update": {},
+            },
+        )
+        print(f"Organization ready: {org.name} ({org.id})")
+
+        # 2. Remove admin and user if they exist (idempotent)
+        deleted = await tx.user.delete_many(where={
+            "email": {"in": [admin_email, user_email]},
             "organizationId": org.id,
         })
-        if old:
-            await db.user.delete(where={"id": old.id})
-            print(f"Deleted old user: {email}")
-
-    # 3. Create fresh users (admin & user)
-    admin = await db.user.create({
-        "email": admin_email,
-        "hashedPassword": hash_password("12121212"),
-        "name": "Admin",
-        "role": "ADMIN",
-        "organizationId": org.id,
-    })
-    print(f"Admin user created: {admin.email}")
-
-    user = await db.user.create({
-        "email": user_email,
-        "hashedPassword": hash_password("12121212"),
-        "name": "User",
-        "role": "USER",
-        "organizationId": org.id,
-    })
-    print(f"Normal user created: {user.email}")
+        if deleted:
+            print(f"Deleted {deleted} old user(s)")
+
+        # 3. Create fresh users (admin & user)
+        await tx.user.create_many(data=[
+            {
+                "email": admin_email,
+                "hashedPassword": seed_password,
+                "name": "Admin",
+                "role": "ADMIN",
+                "organizationId": org.id,
+            },
+            {
+                "email": user_email,
+                "hashedPassword": seed_password,
+                "name": "User",
+                "role": "USER",
+                "organizationId": org.id,
+            },
+        ])
+        print(f"Admin user created: {admin_email}")
+        print(f"Normal user created: {user_email}")
 
     await db.disconnect()
 
@@ -0,0 +1,81 @@
+# ---
+# File: tests/test_flush_monitoring_results.py
+# Purpose: FK-violation recovery in the monitor worker's MonitoringResult flush
+# Run with: python -m unittest discover tests
+# ---
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from prisma.errors import ForeignKeyViolationError
+
+from app.monitors import auto_incident_monitor as worker
+
+
+def foreign_key_error() -> ForeignKeyViolationError:
+    # Same shape the query engine returns for a MonitoringResult whose monitor is gone
+    return ForeignKeyViolationError({
+        "user_facing_error": {
+            "error_code": "P2003",
+            "message": "Foreign key constraint failed on the field: `MonitoringResult_monitorId_fkey (index)`",
+        }
+    })
+
+
+def make_monitor(monitor_id: str) -> SimpleNamespace:
+    return SimpleNamespace(id=monitor_id, interval=30, serviceId="service-1", organizationId="org-1")
+
+
+class FlushMonitoringResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.kept = make_monitor("kept")
+        self.ghost = make_monitor("ghost")
+        for monitor in (self.kept, self.ghost):
+            worker.MONITOR_CACHE[monitor.id] = monitor
+            worker.MONITOR_BUCKETS.setdefault(monitor.interval, {})[monitor.id] = monitor
+        worker._RESULT_BUFFER[:] = [{"monitorId": "kept"}, {"monitorId": "ghost"}]
+
+        self.database = SimpleNamespace(
+            monitoringresult=SimpleNamespace(create_many=mock.AsyncMock()),
+            monitor=SimpleNamespace(find_many=mock.AsyncMock(return_value=[self.kept])),
+        )
+        patches = [
+            mock.patch.object(worker, "database", self.database),
+            mock.patch.object(worker, "invalidate_dashboard_caches", mock.AsyncMock()),
+            mock.patch.object(worker.asyncio, "sleep", mock.AsyncMock()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        worker.MONITOR_CACHE.clear()
+        worker.MONITOR_BUCKETS.clear()
+        worker._RESULT_BUFFER.clear()
+
+    def test_foreign_key_violation_evicts_deleted_monitor_and_retries_the_rest(self):
+        create_many = self.database.monitoringresult.create_many
+        create_many.side_effect = [foreign_key_error(), None]
+
+        asyncio.run(worker.flush_monitoring_results())
+
+        self.assertEqual(create_many.await_count, 2)
+        self.assertEqual(create_many.await_args.kwargs["data"], [{"monitorId": "kept"}])
+        self.assertNotIn("ghost", worker.MONITOR_CACHE)
+        self.assertNotIn("ghost", worker.MONITOR_BUCKETS[30])
+        self.assertIn("kept", worker.MONITOR_CACHE)
+        worker.asyncio.sleep.assert_not_awaited()
+
+    def test_other_errors_drop_the_batch_without_a_lookup(self):
+        self.database.monitoringresult.create_many.side_effect = RuntimeError("connection reset")
+
+        asyncio.run(worker.flush_monitoring_results())
+
+        self.database.monitor.find_many.assert_not_awaited()
+        self.assertIn("ghost", worker.MONITOR_CACHE)
+
+
+if __name__ == "__main__":
+    unittest.main()